@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+Time the drawing primitives of graphalama at several sizes.
+
+It runs without a window, with SDL's dummy video driver, and the results can be saved as JSON
+to compare them with the results of an other version of graphalama:
+
+    python benchmarks/drawing.py --output before.json
+    # change graphalama
+    python benchmarks/drawing.py --output after.json --compare before.json
+
+Use --filter to run only the benchmarks whose name contains a string.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from math import sin, cos
+from statistics import mean, stdev
+from timeit import Timer
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# The graphalama measured is the one of this checkout, even when the script is run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+SIZES = (
+    (64, 32),
+    (400, 300),
+    (1280, 720),
+)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Register a benchmark.
+
+    The decorated function takes a size (width, height) and returns the function to time,
+    or None if the benchmark can not run (missing optional dependency).
+    Everything that is not part of the measure must be done before returning.
+    """
+
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+# Drawings
+
+@benchmark("draw.roundrect")
+def bench_roundrect(size):
+    from graphalama.draw import roundrect
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    return lambda: roundrect(surf, surf.get_rect(), (255, 255, 255, 255), 20, True)
+
+
+@benchmark("draw.circle2")
+def bench_circle2(size):
+    from graphalama.draw import circle2
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    return lambda: circle2(surf, (0, 0), min(size) // 2, (255, 255, 255, 255))
+
+
+@benchmark("draw.ring")
+def bench_ring(size):
+    from graphalama.draw import ring
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    r = min(size) // 2 - 1
+    return lambda: ring(surf, (size[0] // 2, size[1] // 2), r, max(1, r // 5), (255, 255, 255, 255), True)
+
+
+@benchmark("draw.line")
+def bench_line(size):
+    from graphalama.draw import line
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    return lambda: line(surf, (2, 2), (size[0] - 3, size[1] - 3), (255, 255, 255, 255), 5)
+
+
+@benchmark("draw.blured")
+def bench_blured(size):
+    from graphalama.draw import blured, PIL
+    if not PIL:
+        return None  # it does nothing without pillow
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    surf.fill((0, 0, 0, 255), surf.get_rect().inflate(-10, -10))
+    return lambda: blured(surf, 5)
+
+
+@benchmark("draw.greyscaled")
+def bench_greyscaled(size):
+    from graphalama.draw import greyscaled, PIL
+    if not PIL:
+        return None  # it does nothing without pillow
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    surf.fill((30, 144, 255, 255))
+    return lambda: greyscaled(surf)
+
+
+# Colors
+
+@benchmark("Gradient._paint")
+def bench_gradient(size):
+    from graphalama.colors import Gradient
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    gradient = Gradient((255, 0, 0), (0, 0, 255, 128))
+    return lambda: gradient._paint(surf)
+
+
+@benchmark("MultiGradient._paint")
+def bench_multigradient(size):
+    from graphalama.colors import MultiGradient
+    from graphalama.constants import RAINBOW
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    gradient = MultiGradient(*RAINBOW)
+    return lambda: gradient._paint(surf)
+
+
+LUT_GRADIENTS = {
+    "LinearGradient": {"angle": 30},
+    "RadialGradient": {},
+    "ConicGradient": {},
+}
+
+
+def register_lut_gradients():
+    for gradient_name, kwargs in LUT_GRADIENTS.items():
+
+        @benchmark(gradient_name + "._paint")
+        def bench_lut_gradient(size, gradient_name=gradient_name, kwargs=kwargs):
+            from graphalama import colors
+            from graphalama.constants import RAINBOW
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            gradient = getattr(colors, gradient_name)(*RAINBOW, **kwargs)
+
+            def paint():
+                # with the cache, it would only measure a copy
+                colors.GRADIENTS.clear()
+                gradient._paint(surf)
+
+            return paint
+
+
+register_lut_gradients()
+
+
+@benchmark("ImageBrush._paint")
+def bench_image_brush(size):
+    from graphalama.colors import ImageBrush
+    from graphalama.constants import DATA_PATH
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    brush = ImageBrush(pygame.image.load(os.path.join(DATA_PATH, "tick.png")).convert_alpha())
+    return lambda: brush._paint(surf)
+
+
+# Shapes and shadows
+
+def polar_heart(size):
+    from graphalama.shapes import PolarCurve
+    return PolarCurve(size,
+                      lambda t: 16 * sin(t) ** 3,
+                      lambda t: -13 * cos(t) + 5 * cos(2 * t) + 2 * cos(3 * t) + cos(4 * t))
+
+
+SHAPES = {
+    "Rectangle": lambda size: __import__("graphalama.shapes").shapes.Rectangle(size, border=3),
+    "RoundedRect": lambda size: __import__("graphalama.shapes").shapes.RoundedRect(size, border=3),
+    "PolarCurve": polar_heart,
+}
+
+
+def uncached(get_mask):
+    """Call get_mask with empty caches, to measure the drawing of the mask."""
+    from graphalama.shapes import MASKS, NINE_SLICES, OUTLINES
+    MASKS.clear()
+    NINE_SLICES.clear()
+    OUTLINES.clear()
+    return get_mask()
+
+
+def register_shapes():
+    for shape_name, make_shape in SHAPES.items():
+        # the default arguments keep the current values of the loop
+
+        @benchmark(shape_name + ".get_mask")
+        def bench_mask(size, make_shape=make_shape):
+            shape = make_shape(size)
+            return lambda: uncached(shape.get_mask)
+
+        @benchmark(shape_name + ".get_border_mask")
+        def bench_border_mask(size, make_shape=make_shape):
+            shape = make_shape(size)
+            return lambda: uncached(shape.get_border_mask)
+
+
+register_shapes()
+
+
+@benchmark("Shadow.create_from")
+def bench_shadow(size):
+    from graphalama.core import Widget
+    from graphalama.shadow import Shadow
+    from graphalama.shapes import RoundedRect
+    shadow = Shadow(3, 3, 3)
+    widget = Widget((0, 0), RoundedRect(size), shadow=shadow)
+    return lambda: shadow.create_from(widget)
+
+
+# Widgets
+
+@benchmark("Widget.draw_background")
+def bench_background(size):
+    from graphalama.core import Widget
+    from graphalama.shapes import RoundedRect
+    widget = Widget((0, 0), RoundedRect(size, border=3), bg_color=(30, 144, 255), border_color=(20, 20, 20))
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    return lambda: widget.draw_background(surf)
+
+
+@benchmark("SimpleText.draw_content")
+def bench_text(size):
+    from graphalama.text import SimpleText
+    from graphalama.font import default_font
+    font = default_font(max(8, size[1] // 2))
+    text = SimpleText("Graphalama " * max(1, size[0] // 200), (0, 0), font=font)
+    surf = pygame.Surface(text.content_rect.size, pygame.SRCALPHA)
+    return lambda: text.draw_content(surf)
+
+
+@benchmark("AnimatedImage next frame")
+def bench_animated_image(size):
+    from graphalama.sprites import AnimatedImage, SpriteAnimation
+    from graphalama.constants import DATA_PATH
+    tick = pygame.image.load(os.path.join(DATA_PATH, "tick.png")).convert_alpha()
+    frames = [pygame.transform.rotate(tick, angle) for angle in range(0, 360, 30)]
+    widget = AnimatedImage(SpriteAnimation(frames), (0, 0), size)
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+
+    def next_frame():
+        widget.frame_index = (widget.frame_index + 1) % len(frames)
+        widget._blit_layers(surf)
+
+    return next_frame
+
+
+# Running
+
+def time_function(function, repeat=5, min_time=0.2):
+    """Return statistics about the time taken by one call to function, in seconds."""
+
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    # autorange aims at 0.2s per run, we can go lower for quick runs
+    number = max(1, int(number * min_time / 0.2))
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {
+        "min": min(times),
+        "mean": mean(times),
+        "stdev": stdev(times) if len(times) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def git_commit():
+    """Return the current commit of graphalama, if it's in a git repository."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    from graphalama.draw import PIL, NUMPY
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "pillow": PIL,
+        "numpy": NUMPY,
+    }
+
+
+def run(name_filter="", repeat=5, min_time=0.2):
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter not in name:
+            continue
+
+        for size in SIZES:
+            key = "{}[{}x{}]".format(name, *size)
+            function = setup(size)
+            if function is None:
+                print("{:<45} {:>15}".format(key, "skipped"), file=sys.stderr)
+                continue
+
+            results[key] = time_function(function, repeat, min_time)
+            print("{:<45} {:>12.1f} µs".format(key, results[key]["min"] * 1e6), file=sys.stderr)
+
+    return {"meta": metadata(), "results": results}
+
+
+def compare(results, baseline, threshold):
+    """Print the speed ratio with the baseline and return the names of the benchmarks that got slower."""
+
+    regressions = []
+    print("\n{:<45} {:>12} {:>12} {:>8}".format("benchmark", "before (µs)", "after (µs)", "ratio"))
+    for key, result in results["results"].items():
+        if key not in baseline["results"]:
+            continue
+
+        before = baseline["results"][key]["min"]
+        after = result["min"]
+        ratio = after / before
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            flag = " slower"
+        print("{:<45} {:>12.1f} {:>12.1f} {:>7.2f}x{}".format(key, before * 1e6, after * 1e6, ratio, flag))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", "-o", help="Save the results in this JSON file.")
+    parser.add_argument("--compare", "-c", help="Compare the results to this JSON file.")
+    parser.add_argument("--filter", "-f", default="", help="Run only the benchmarks containing this string.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measures for each benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Approximate duration of one measure (s).")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression when comparing.")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    results = run(args.filter, args.repeat, args.min_time)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+Compare the time taken to dispatch mouse motions with and without the spatial index.
+
+Run it with `python benchmarks/spatial_index.py [nb_widgets] [nb_events]`.
+"""
+
+import os
+import random
+import sys
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# The graphalama measured is the one of this checkout, even when the script is run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from pygame.constants import MOUSEMOTION
+
+from graphalama.app import Screen
+from graphalama.core import Widget
+
+SCREEN_SIZE = 1920, 1080
+
+
+def make_screen(nb_widgets):
+    """A screen with a grid of `nb_widgets` small widgets covering the whole window."""
+
+    columns = int((nb_widgets * SCREEN_SIZE[0] / SCREEN_SIZE[1]) ** 0.5) + 1
+    rows = nb_widgets // columns + 1
+    width = SCREEN_SIZE[0] // columns
+    height = SCREEN_SIZE[1] // rows
+
+    widgets = [Widget((i % columns * width, i // columns * height), (width - 1, height - 1))
+               for i in range(nb_widgets)]
+    return Screen(None, widgets)
+
+
+def make_events(nb_events):
+    """A stream of mouse motions with a random walk, like a real mouse."""
+
+    random.seed(42)
+    x, y = SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2
+    events = []
+    for _ in range(nb_events):
+        dx, dy = random.randint(-20, 20), random.randint(-20, 20)
+        x = min(max(x + dx, 0), SCREEN_SIZE[0] - 1)
+        y = min(max(y + dy, 0), SCREEN_SIZE[1] - 1)
+        events.append(pygame.event.Event(MOUSEMOTION, pos=(x, y), rel=(dx, dy), buttons=(0, 0, 0)))
+    return events
+
+
+def bench(screen, events):
+    """Return the mean time in seconds taken by the screen to handle one event."""
+
+    start = perf_counter()
+    for event in events:
+        screen.update(event)
+    return (perf_counter() - start) / len(events)
+
+
+def main(nb_widgets=10000, nb_events=2000):
+    pygame.init()
+    pygame.display.set_mode(SCREEN_SIZE)
+
+    screen = make_screen(nb_widgets)
+    events = make_events(nb_events)
+
+    screen.SPATIAL_INDEX = False
+    walk = bench(screen, events[:nb_events // 10])
+    screen.SPATIAL_INDEX = True
+    bench(screen, events[:1])  # builds the index
+    indexed = bench(screen, events)
+
+    print(f"{nb_widgets} widgets, {nb_events} mouse motions")
+    print(f"  tree walk:     {walk * 1e6:10.1f} µs/event")
+    print(f"  spatial index: {indexed * 1e6:10.1f} µs/event")
+    print(f"  speedup:       {walk / indexed:10.1f}x")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
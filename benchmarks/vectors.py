@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# coding=utf-8
+
+"""
+Compare the cost of graphalama.maths.Pos with the namedtuple it replaced and with pygame's Vector2.
+
+Run it with `python benchmarks/vectors.py`.
+"""
+
+from collections import namedtuple
+from timeit import repeat
+import os
+import sys
+
+from pygame.math import Vector2
+
+# The graphalama measured is the one of this checkout, even when the script is run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graphalama.maths import Pos
+
+
+class NamedTuplePos(namedtuple("Pos", ('x', 'y'))):
+    """The previous implementation of Pos, kept as a reference."""
+
+    def __new__(cls, *c):
+        if len(c) == 0:
+            c = (0, 0)
+        elif len(c) == 1:
+            assert len(c[0]) == 2
+            c = c[0]
+        elif len(c) > 2:
+            raise TypeError
+
+        # noinspection PyArgumentList
+        return tuple.__new__(cls, c)
+
+    def __add__(self, other):
+        return NamedTuplePos(self[0] + other[0], self[1] + other[1])
+
+    def __mul__(self, other):
+        return NamedTuplePos(self[0] * other, self[1] * other)
+
+
+OPERATIONS = {
+    "construction (x, y)": "V(3, 4)",
+    "construction (tuple)": "V(t)",
+    "addition": "a + b",
+    "addition with a tuple": "a + t",
+    "multiplication": "a * 3",
+    "unpacking": "x, y = a",
+    "attribute": "a.x",
+}
+
+
+def bench(statement, vector_class, number=200000):
+    """Return the best time in nanoseconds of one execution of `statement`."""
+
+    namespace = {"V": vector_class, "a": vector_class(3, 4), "b": vector_class(5, 6), "t": (7, 8)}
+    return min(repeat(statement, globals=namespace, number=number, repeat=5)) / number * 1e9
+
+
+def main():
+    classes = (("namedtuple", NamedTuplePos), ("Pos", Pos), ("Vector2", Vector2))
+
+    print(f"{'operation':<24}" + "".join(f"{name:>14}" for name, _ in classes))
+    for name, statement in OPERATIONS.items():
+        times = [bench(statement, cls) for _, cls in classes]
+        print(f"{name:<24}" + "".join(f"{t:>11.1f} ns" for t in times))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
 from . import draw, colors, font, anim
-from . import maths, constants
-from . import widgets, shapes, shadow
+from . import maths, constants, cache, atlas
+from . import widgets, shapes, shadow, spatial, trace, sprites
 from . import app
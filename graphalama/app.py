@@ -1,11 +1,25 @@
 import pygame
 import logging
-from .widgets import WidgetList
-from .colors import to_color
+from pygame.constants import MOUSEMOTION, KEYDOWN, TEXTINPUT, QUIT
+
+from .widgets import Widget, WidgetList
+from .core import WidgetStats
+from .colors import repaint_settled_previews, to_color
 from .constants import WHITE
+from .maths import merge_overlapping_rects
+from .spatial import SpatialIndex
+from .trace import TRACER
 
 LOGGER = logging.getLogger(__name__)
 
+CUSTOM_EVENTS = 256
+"""Number of the custom event types, from pygame.USEREVENT, that are kept blocked when a screen filters events."""
+KNOWN_EVENT_TYPES = frozenset(
+    {value for value in vars(pygame.constants).values()
+     if isinstance(value, int) and 0 < value < pygame.NUMEVENTS and pygame.event.event_name(value) != "Unknown"}
+    | set(range(pygame.USEREVENT, min(pygame.USEREVENT + CUSTOM_EVENTS, pygame.NUMEVENTS))))
+"""The event types of SDL, pygame and the first custom ones, whose blocked state is saved by App.filter_events."""
+
 
 class App:
     """
@@ -46,7 +60,7 @@ class App:
                                                        32).convert_alpha()
             else:
                 # default to the bigger we can
-                LOGGER.info(f"Choosing the biggest resolution we can: {pygame.display.list_modes()[0]}")
+                LOGGER.info("Choosing the biggest resolution we can: %s", pygame.display.list_modes()[0])
                 display_size = pygame.display.set_mode(pygame.display.list_modes()[0])
 
         self.screens = screens
@@ -54,8 +68,10 @@ class App:
         self.display = display_size
         self.clock = pygame.time.Clock()
         self.running = False
+        self._blocked_events = ()  # the events blocked by the application, before a screen filtered them
 
         self.current_screen = self.screens[self.screen](self)
+        self.filter_events()
         LOGGER.info("Finished initializing an App")
 
     def quit(self):
@@ -70,21 +86,40 @@ class App:
             LOGGER.error("Trying to run an already running app")
             raise RuntimeError("You tried to run an already running app")
 
+        tracer = TRACER
         self.running = True
         while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            if tracer.enabled:
+                tracer.begin_frame()
+
+            for event in self.current_screen.preprocess_events(pygame.event.get()):
+                if event.type == QUIT:
                     LOGGER.info("Pygame tells us to quit")
                     self.quit()
                 else:
                     self.current_screen.update(event)
+            if tracer.enabled:
+                tracer.end_phase("events")
 
             self.current_screen.internal_logic()
+            if tracer.enabled:
+                tracer.end_phase("internal_logic")
 
-            self.current_screen.render(self.display)
-            pygame.display.flip()
+            rects = self.current_screen.render(self.display)
+            if tracer.enabled:
+                tracer.end_phase("render")
+
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            if tracer.enabled:
+                tracer.end_phase("display")
 
             self.clock.tick(self.current_screen.FPS)
+            if tracer.enabled:
+                tracer.end_phase("tick")
+                tracer.end_frame()
 
     def set_screen(self, new_screen_id):
         """
@@ -93,10 +128,41 @@ class App:
         :param new_screen_id: A key of the screens dictionary
         """
 
-        LOGGER.info(f"Changing screen from {self.screen} to {new_screen_id}")
+        LOGGER.info("Changing screen from %s to %s", self.screen, new_screen_id)
         self.screen = new_screen_id
+        previous = self.current_screen
         # We instantiate the screen class
         self.current_screen = self.screens[self.screen](self)
+        self.filter_events(previous)
+
+    def filter_events(self, previous_screen=None):
+        """
+        Block the event types that the current screen doesn't handle, so they never reach the event queue.
+
+        The filter is changed only when the current or the previous screen has EVENT_TYPES. The events
+        blocked by the application before are blocked again when going back to a screen without EVENT_TYPES.
+        Only the types in KNOWN_EVENT_TYPES and the EVENT_TYPES of the screens are blocked and restored,
+        as changing all the possible types takes tens of milliseconds.
+        """
+
+        event_types = self.current_screen.EVENT_TYPES
+        previous_types = previous_screen.EVENT_TYPES if previous_screen is not None else None
+        if event_types is None and previous_types is None:
+            return
+
+        if previous_types is None:
+            self._blocked_events = [event for event in KNOWN_EVENT_TYPES.union(event_types)
+                                    if pygame.event.get_blocked(event)]
+
+        if event_types is None:
+            pygame.event.set_allowed(list(KNOWN_EVENT_TYPES.union(previous_types)))
+            if self._blocked_events:
+                pygame.event.set_blocked(self._blocked_events)
+        else:
+            # we always need to know when to quit
+            allowed = {QUIT, *event_types}
+            pygame.event.set_blocked([event for event in KNOWN_EVENT_TYPES if event not in allowed])
+            pygame.event.set_allowed(list(allowed))
 
     def set_temp_screen(self, screen):
         """
@@ -106,8 +172,10 @@ class App:
         """
 
         self.screen = None
+        previous = self.current_screen
         self.current_screen = screen(self)
-        LOGGER.info(f"Changing screen to temp screen {self.current_screen}")
+        self.filter_events(previous)
+        LOGGER.info("Changing screen to temp screen %s", self.current_screen)
 
 
 class Screen:
@@ -117,24 +185,91 @@ class Screen:
     To implement a new screen, you need to override `draw_background`, `internal_logic`,
     and pass a list of widgets to the constructor, and everything else is taken care of.
     To change screen, call `self.app.set_screen(SCREEN_ID)`
+
+    Only the parts of the screen where widgets changed are redrawn each frame.
+    `draw_background` is called only when the background is needed again and draws it on a cached surface,
+    which is then copied on the display where widgets changed. If you draw something else on the display,
+    or if the background changes, call `invalidate()` to redraw everything on the next frame.
     """
 
     FPS = 60
+    SPATIAL_INDEX = True
+    """
+    Whether mouse motions are sent only to the widgets under the mouse, found with a SpatialIndex.
+
+    Disable it if some of your widgets override `update` to handle MOUSEMOTION events.
+    """
+    COALESCE_MOUSE_MOTION = True
+    """Whether consecutive mouse motions in a frame are merged into one, with the last position and the total rel."""
+    COALESCE_KEY_REPEAT = True
+    """
+    Whether consecutive presses of the same key in a frame, sent by the key repeat, are merged into one.
+
+    Presses followed by a TEXTINPUT, when text input is enabled, are never merged, so no typed text is lost.
+    """
+    EVENT_TYPES = None
+    """
+    The event types that the screen handles, the others in KNOWN_EVENT_TYPES are blocked by the App.
+    None to receive every event.
+    """
 
     def __init__(self, app, widgets=(), bg_color=None):
         LOGGER.info("Starting a new Screen")
         bg_color = WHITE if bg_color is None else bg_color
         self.bg_color = bg_color
         self.background = None
+        self.full_redraw = True
+        """Whether the whole screen will be redrawn on the next frame. See invalidate()."""
 
         self.app = app
-        self.widgets = WidgetList(widgets)
+        self.spatial_index = None  # type: SpatialIndex
+        self.widgets = widgets
 
     def __call__(self, app):
         # This way we can pass already build screens to a machine without errors
         self.app = app
+        # and the display may show an other screen since it was last rendered
+        self.invalidate()
         return self
 
+    def invalidate(self):
+        """Force the whole screen, and its background, to be redrawn on the next frame."""
+        self.full_redraw = True
+        self.background = None
+
+    @property
+    def stats(self):
+        """
+        The WidgetStats of all the widgets of the screen added together.
+
+        They are collected only while Widget.COLLECT_STATS is True.
+        Look at the `stats` of each widget of `self.widgets.walk()` to find which ones redraw the most.
+        """
+
+        total = WidgetStats()
+        for widget in self.widgets.walk():
+            if widget._stats is not None:
+                total += widget._stats
+        return total
+
+    def reset_stats(self):
+        """Reset the WidgetStats of all the widgets of the screen."""
+        for widget in self.widgets.walk():
+            if widget._stats is not None:
+                widget._stats.reset()
+
+    @property
+    def widgets(self):
+        """The widgets of the screen."""
+        return self._widgets
+
+    @widgets.setter
+    def widgets(self, value):
+        self._widgets = value if isinstance(value, WidgetList) else WidgetList(value)
+        self.spatial_index = SpatialIndex(self._widgets)
+        # the previous widgets are still on the display
+        self.invalidate()
+
     @property
     def bg_color(self):
         return self._bg_color
@@ -145,20 +280,84 @@ class Screen:
         self._bg_color = to_color(value)
 
     def draw_background(self, display):
+        """
+        Draw the background of the screen on the display. Override it to draw an other background.
+
+        It is drawn on a cached surface, so it is called again only after `invalidate()` or a resize.
+        """
+
+        self.bg_color.paint(display)
+
+    def get_background(self, size):
+        """Return the cached background of the screen, drawn with `draw_background` if it needs to."""
 
         # caching mechanism, particularly useful when the Color is an image or a computer drawing (gradient...)
-        if not self.background or display.get_size() != self.background.get_size():
-            self.background = pygame.Surface(display.get_size())
-            self.bg_color.paint(self.background)
+        if not self.background or size != self.background.get_size():
+            self.background = pygame.Surface(size)
+            self.draw_background(self.background)
+
+        return self.background
 
-        display.blit(self.background, (0, 0))
+    def preprocess_events(self, events):
+        """
+        Return the events of a frame to pass to `update`, with the bursts of similar events merged.
+
+        See COALESCE_MOUSE_MOTION and COALESCE_KEY_REPEAT.
+        """
+
+        events = list(events)
+        processed = []
+        for i, event in enumerate(events):
+            if processed and processed[-1].type == event.type:
+                last = processed[-1]
+
+                if event.type == MOUSEMOTION and self.COALESCE_MOUSE_MOTION:
+                    rel = (last.rel[0] + event.rel[0], last.rel[1] + event.rel[1])
+                    processed[-1] = pygame.event.Event(MOUSEMOTION, dict(event.dict, rel=rel))
+                    continue
+
+                if event.type == KEYDOWN and self.COALESCE_KEY_REPEAT \
+                        and event.key == last.key and event.mod == last.mod \
+                        and (i + 1 == len(events) or events[i + 1].type != TEXTINPUT):
+                    continue
+
+            processed.append(event)
+
+        return processed
 
     def update(self, event):
+        if event.type == MOUSEMOTION and self.SPATIAL_INDEX:
+            self.spatial_index.mouse_motion(event)
+            return False
+
         return self.widgets.update(event)
 
     def internal_logic(self):
         """Override it if your screen has stuff to run once a frame, before rendering"""
 
     def render(self, display):
-        self.draw_background(display)
-        self.widgets.render(display)
+        """
+        Redraw the parts of the display that changed since the last frame.
+
+        :return: The list of rectangles that were redrawn, to pass to `pygame.display.update`.
+        """
+
+        Widget.RENDER_STATS.reset()
+        repaint_settled_previews()
+        rects = self.widgets.get_dirty_rects()
+
+        if self.full_redraw or not self.background or display.get_size() != self.background.get_size():
+            self.full_redraw = False
+            rects = [display.get_rect()]
+        else:
+            display_rect = display.get_rect()
+            rects = merge_overlapping_rects(display_rect.clip(rect) for rect in rects
+                                            if display_rect.colliderect(rect))
+            if not rects:
+                return []
+
+        background = self.get_background(display.get_size())
+        for rect in rects:
+            display.blit(background, rect, rect)
+        self.widgets.render(display, rects)
+        return rects
@@ -0,0 +1,192 @@
+"""
+This module provides Atlas, to pack many small images into a few large surfaces.
+
+Blitting from a few large surfaces is friendlier to the memory caches than from hundreds of tiny ones,
+and an image added once can be shared by every widget that shows it:
+
+    icons = Atlas()
+    region = icons.load("data/save.png")
+    button = ImageButton(on_save, color=ImageBrush(region))
+
+The images are placed on shelves: rows of the height of their highest image, filled from left to right.
+"""
+
+from collections import namedtuple
+import logging
+
+import pygame
+
+from .cache import surface_bytes
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AtlasRegion(namedtuple("AtlasRegion", ("page", "rect"))):
+    """An image in an atlas: the surface it is on and where it is on that surface."""
+
+    __slots__ = ()
+
+    @property
+    def size(self):
+        return self.rect.size
+
+    @property
+    def image(self):
+        """The image, as a subsurface of the page, that shares its pixels."""
+        return self.page.subsurface(self.rect)
+
+
+def as_surface(image):
+    """Return the surface of an image, that can be an AtlasRegion or already a surface."""
+    return image.image if isinstance(image, AtlasRegion) else image
+
+
+class _Shelf:
+    __slots__ = ("y", "height", "width")
+
+    def __init__(self, y, height):
+        self.y = y
+        self.height = height
+        self.width = 0  # used width, from the left of the page
+
+
+class Atlas:
+    """
+    Pack images into large surfaces, called pages, and give the regions where they are.
+
+    Images can be added at any time, new pages are created when the others are full.
+    Images larger than a page get a page of their own.
+    """
+
+    PAGE_SIZE = (1024, 1024)
+    """Size of the pages created for the images."""
+
+    def __init__(self, page_size=None):
+        """
+        Pack images into large surfaces.
+
+        :param page_size: The size of the pages. By default, PAGE_SIZE.
+        """
+
+        self.page_size = tuple(page_size) if page_size is not None else self.PAGE_SIZE
+        self.pages = []  # type: list[pygame.Surface]
+        self.regions = {}  # type: dict[object, AtlasRegion]
+        """The regions of the images, indexed by the key given when they were added."""
+
+        self._shelves = []  # the shelves of each page
+        self._used_area = 0
+
+    def __repr__(self):
+        return "<Atlas {} images on {} pages, {:.1f}/{:.1f} MB used>".format(
+            len(self.regions), len(self.pages), self.used_bytes / 2 ** 20, self.bytes / 2 ** 20)
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __contains__(self, key):
+        return key in self.regions
+
+    def __getitem__(self, key):
+        return self.regions[key]
+
+    @property
+    def bytes(self):
+        """The memory used by the pages."""
+        return sum(surface_bytes(page) for page in self.pages)
+
+    @property
+    def used_bytes(self):
+        """The memory used by the images in the pages, the rest is free or lost between the images."""
+        return self._used_area * 4
+
+    def add(self, key, image):
+        """
+        Copy an image into the atlas and return its region.
+
+        If an image was already added with the same key, its region is returned and the image is not added again.
+        :param key: Anything hashable to find the image again, ie. its path.
+        :param pygame.Surface image: The image to add.
+        """
+
+        region = self.regions.get(key)
+        if region is not None:
+            return region
+
+        width, height = image.get_size()
+        page_index, pos = self._place(width, height)
+        page = self.pages[page_index]
+
+        rect = pygame.Rect(pos, (width, height))
+        # Adding to the transparent page copies the pixels, without alpha blending
+        page.blit(image, rect, None, pygame.BLEND_RGBA_ADD)
+
+        region = AtlasRegion(page, rect)
+        self.regions[key] = region
+        self._used_area += width * height
+        return region
+
+    def load(self, path):
+        """Load the image at `path` in the atlas, only the first time, and return its region."""
+
+        region = self.regions.get(path)
+        if region is None:
+            LOGGER.info("Loading %s in %s", path, self)
+            region = self.add(path, pygame.image.load(path))
+        return region
+
+    def clear(self):
+        """Forget all the images. The regions given before still show their images."""
+
+        self.pages = []
+        self.regions = {}
+        self._shelves = []
+        self._used_area = 0
+
+    def _place(self, width, height):
+        """Find room for an image and return the index of its page and its position on it."""
+
+        page_width, page_height = self.page_size
+        if width > page_width or height > page_height:
+            return self._new_page((width, height)), (0, 0)
+
+        for page_index, shelves in enumerate(self._shelves):
+            page = self.pages[page_index]
+            # The shelf that wastes the least height
+            best = None
+            for shelf in shelves:
+                if shelf.height >= height and shelf.width + width <= page.get_width() \
+                        and (best is None or shelf.height < best.height):
+                    best = shelf
+
+            if best is None:
+                top = shelves[-1].y + shelves[-1].height if shelves else 0
+                if top + height > page.get_height():
+                    continue
+                best = _Shelf(top, height)
+                shelves.append(best)
+
+            pos = (best.width, best.y)
+            best.width += width
+            return page_index, pos
+
+        page_index = self._new_page(self.page_size)
+        shelf = _Shelf(0, height)
+        shelf.width = width
+        self._shelves[page_index].append(shelf)
+        return page_index, (0, 0)
+
+    def _new_page(self, size):
+        LOGGER.info("Adding a %s page to %s", size, self)
+
+        self.pages.append(pygame.Surface(size, pygame.SRCALPHA))
+        if size == self.page_size:
+            self._shelves.append([])
+        else:
+            # a page for a single large image, that nothing else can fit in
+            self._shelves.append([_Shelf(0, size[1])])
+            self._shelves[-1][0].width = size[0]
+        return len(self.pages) - 1
+
+
+ATLAS = Atlas((512, 512))
+"""The atlas used for the images of the widgets of graphalama. Its pages are small as it holds only a few icons."""
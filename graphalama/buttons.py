@@ -2,11 +2,11 @@ from math import pi, sin, cos
 from threading import Thread
 import logging
 
+from graphalama.atlas import ATLAS
 from graphalama.colors import ImageBrush, Color, to_color
 from graphalama.constants import CENTER, DEFAULT, LEFT, TRANSPARENT, WHITE, DATA_PATH, GREY, RIGHT, ALLANCHOR
 from graphalama.shadow import NoShadow
 from graphalama.shapes import Rectangle
-from .constants import ALLANCHOR
 from .core import Widget, WidgetList
 from .text import SimpleText
 from .maths import Pos
@@ -29,7 +29,7 @@ class Button(Widget):
         self.function = function
 
         Widget.LAST_PLACED_WIDGET = self
-        LOGGER.info(f"Finished initializing {self}")
+        LOGGER.info("Finished initializing %s", self)
 
     def __str__(self):
         return "<Button-{}>".format(self.text)
@@ -45,7 +45,7 @@ class Button(Widget):
 
         if self.shape.auto_size:
             self.size = self.shape.widget_size_from_content_size(self.text_widget.prefered_size)
-        LOGGER.info(f"Text of {self} changed")
+        LOGGER.info("Text of %s changed", self)
 
     def on_mouse_enter(self, event):
         self.invalidate_bg()
@@ -55,7 +55,7 @@ class Button(Widget):
         self.invalidate_shadow()
 
     def on_click(self, event):
-        LOGGER.info(f"{self} clicked")
+        LOGGER.info("%s clicked", self)
         Thread(target=self.function).start()
 
     def on_mouse_button_up(self, event):
@@ -110,10 +110,10 @@ class CheckBox(Widget):
         self.checked = False
 
         Widget.LAST_PLACED_WIDGET = self
-        LOGGER.info(f"Finished initializing {self}")
+        LOGGER.info("Finished initializing %s", self)
 
     def on_click(self, event):
-        LOGGER.info(f"{self} clicked")
+        LOGGER.info("%s clicked", self)
         self.change_checked()
 
     @property
@@ -134,7 +134,8 @@ class CheckBox(Widget):
             self._checked = value
 
         if self.checked:
-            self.box_widget.bg_color = ImageBrush.from_file(DATA_PATH + "tick.png", CENTER)
+            # the tick is loaded only once, for all the checkboxes
+            self.box_widget.bg_color = ImageBrush.from_file(DATA_PATH + "tick.png", CENTER, atlas=ATLAS)
         else:
             self.box_widget.bg_color = Color(WHITE)
 
@@ -206,7 +207,7 @@ class CarouselSwitch(Button):
         self.on_choice = on_choice
 
         Widget.LAST_PLACED_WIDGET = self
-        LOGGER.info(f"Initialized {self}")
+        LOGGER.info("Initialized %s", self)
 
     @property
     def current_option(self):
@@ -244,10 +245,10 @@ class CarouselSwitch(Button):
         # we want that a click on the right side is the same as a click on the right arrow, so the user doesn't have to click exactly on the arrow
         if event.pos[0] > self.absolute_rect.centerx:
             change = 1
-            LOGGER.info(f"{self} was clicked to the right")
+            LOGGER.info("%s was clicked to the right", self)
         else:
             change = -1
-            LOGGER.info(f"{self} was clicked to the left")
+            LOGGER.info("%s was clicked to the left", self)
 
         deplacement = Pos(-change*self.size[0], 0)
 
@@ -0,0 +1,152 @@
+"""
+This module provides caches shared between widgets, so identical images are drawn or loaded only once.
+"""
+
+from collections import OrderedDict
+import logging
+import os
+
+import pygame
+
+LOGGER = logging.getLogger(__name__)
+
+
+def surface_bytes(surf):
+    """Return the memory used by the pixels of a surface."""
+    return surf.get_bytesize() * surf.get_width() * surf.get_height()
+
+
+class LRUCache:
+    """
+    A cache that forgets the least recently used items when the total size of its items exceeds a budget.
+
+    Items bigger than the whole budget are never stored.
+    """
+
+    def __init__(self, max_size, size_of=surface_bytes):
+        """
+        A cache that forgets the least recently used items when the total size of its items exceeds a budget.
+
+        :param int max_size: The budget, in the unit returned by size_of.
+        :param size_of: A function that returns the size of an item. By default, the bytes of a surface.
+        """
+
+        self.max_size = max_size
+        self.size_of = size_of
+        self.size = 0
+        """Total size of the items in the cache."""
+        self.hits = 0
+        self.misses = 0
+
+        self._items = OrderedDict()  # key -> (value, size), the least recently used first
+
+    def __repr__(self):
+        return "<LRUCache {} items, {}/{}, {} hits, {} misses>".format(len(self), self.size, self.max_size,
+                                                                     self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        """Return the item stored for `key`, or `default` if it isn't in the cache."""
+
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, value):
+        """Store an item in the cache, forgetting the least recently used ones if needed."""
+
+        if key in self._items:
+            self.size -= self._items.pop(key)[1]
+
+        size = self.size_of(value)
+        if size > self.max_size:
+            return
+
+        self._items[key] = (value, size)
+        self.size += size
+        while self.size > self.max_size:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self.size -= old_size
+
+    def get_or_create(self, key, create, *args):
+        """Return the item stored for `key`, or create it with `create(*args)` and store it."""
+
+        value = self.get(key)
+        if value is None:
+            value = create(*args)
+            self.put(key, value)
+        return value
+
+    def resize(self, max_size):
+        """Change the budget of the cache, forgetting the least recently used items if it is now too small."""
+
+        self.max_size = max_size
+        while self.size > self.max_size:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self.size -= old_size
+
+    def clear(self):
+        self._items.clear()
+        self.size = 0
+
+
+class ImageCache(LRUCache):
+    """
+    Images loaded from files, so each file is read, decoded and converted only once.
+
+    The images are shared by everything that loads them: copy one before modifying it.
+    """
+
+    def __init__(self, max_size=64 * 2 ** 20):
+        """
+        Images loaded from files.
+
+        :param int max_size: The budget in bytes. Use resize() to change it later.
+        """
+
+        super().__init__(max_size)
+
+    def __repr__(self):
+        return "<ImageCache {} images, {:.1f}/{:.1f} MB, {} hits, {} misses>".format(
+            len(self), self.size / 2 ** 20, self.max_size / 2 ** 20, self.hits, self.misses)
+
+    def load(self, path, alpha=True):
+        """
+        Return the image at `path`, loaded only the first time.
+
+        :param alpha: How the image is converted to the format of the display: True with convert_alpha(),
+            False with convert(), None to keep it as it is in the file (which doesn't need a display).
+        """
+
+        return self.get_or_create((os.path.abspath(path), alpha), self._load, path, alpha)
+
+    def preload(self, paths, alpha=True):
+        """Load the images at the given paths in advance, ie. before showing a screen that uses them."""
+
+        for path in paths:
+            self.load(path, alpha)
+
+    @staticmethod
+    def _load(path, alpha):
+        LOGGER.info("Loading %s", path)
+
+        image = pygame.image.load(path)
+        if alpha:
+            image = image.convert_alpha()
+        elif alpha is not None:
+            image = image.convert()
+        return image
+
+
+IMAGES = ImageCache()
+"""The images loaded by ImageBrush.from_file and the other constructors that take paths."""
@@ -1,12 +1,30 @@
 """
 This module provides functions and classes to manipulate colors and grdients.
 """
-import pygame.gfxdraw
-from pygame.constants import BLEND_RGBA_MIN, BLEND_RGB_MULT
+from math import cos, sin, radians, hypot, pi
+from time import perf_counter
+
+import pygame
+from pygame.constants import BLEND_RGBA_MIN, BLEND_RGB_MULT, BLEND_RGBA_ADD, SRCALPHA
 
 from graphalama.constants import TRANSPARENT, FIT, FILL, STRETCH
 from graphalama.draw import greyscaled
+from .atlas import as_surface
+from .cache import LRUCache, IMAGES
 from .constants import WHITE, BLACK
+from .maths import clamp
+
+try:
+    import numpy as np
+except (ImportError, ModuleNotFoundError):
+    NUMPY = False
+else:
+    NUMPY = True
+
+GRADIENTS = LRUCache(32 * 2 ** 20)
+"""The lines and surfaces painted by the gradients, shared between identical gradients. Its budget is in bytes."""
+PREVIEWS = set()
+"""The ImageBrushes that painted a quick preview and wait for their size to settle. See repaint_settled_previews."""
 
 
 def bw_contrasted(color, threshold=200):
@@ -36,6 +54,34 @@ def mix(color1, color2, pos=0.5):
     return int(red), int(green), int(blue), int(alpha)
 
 
+def ramp(stops, length):
+    """
+    Return the colors of a line of `length` pixels going through the stops of a gradient, as RGBA bytes.
+
+    Before the first stop, the line has the color of the first stop, and after the last one, the color of the last.
+    :param stops: The (position, color) of the gradient, sorted by position. Positions are between 0 and 1.
+    """
+
+    colors = [tuple(color) + (255,) * (4 - len(color)) for _, color in stops]
+    positions = [clamp(round(pos * length), 0, length) for pos, _ in stops]
+
+    if NUMPY:
+        line = np.empty((length, 4))
+        line[:positions[0]] = colors[0]
+        line[positions[-1]:] = colors[-1]
+        for start, end, color1, color2 in zip(positions, positions[1:], colors, colors[1:]):
+            if end > start:
+                # the same operations as mix(), so both ways give the same pixels
+                pos = 1 - np.arange(end - start) / max(1, end - start - 1)
+                line[start:end] = np.outer(pos, color1) + np.outer(1 - pos, color2)
+        return line.astype(np.uint8).tobytes()
+
+    line = [colors[0]] * positions[0] + [colors[-1]] * (length - positions[0])
+    for start, end, color1, color2 in zip(positions, positions[1:], colors, colors[1:]):
+        line[start:end] = [mix(color1, color2, 1 - x / max(1, end - start - 1)) for x in range(end - start)]
+    return bytes(channel for color in line for channel in color)
+
+
 def to_color(maybe_color):
     if isinstance(maybe_color, Color):
         return maybe_color
@@ -66,6 +112,13 @@ class Color:
     def _paint(self, surf):
         surf.fill(self.color)
 
+    def watch_preview(self, callback):
+        """
+        Call `callback` once when the surfaces just painted with this color should be painted again.
+
+        Widgets register after painting, so a color can paint a quick preview first and the final result later.
+        """
+
     # post processing
     def paint(self, surf):
         self._paint(surf)
@@ -103,17 +156,35 @@ class Gradient(Color):
     def has_transparency(self):
         return super().has_transparency or len(self.end) > 3 and self.end[3] < 255
 
+    @property
+    def stops(self):
+        """The (position, color) of the gradient, with positions between 0 and 1."""
+        return (0, self.color), (1, self.end)
+
+    def line(self, length, surf):
+        """
+        Return a surface one pixel thick and `length` pixels long along the gradient, in the format of `surf`.
+
+        The lines are cached in GRADIENTS, so each one is computed only once for each size.
+        """
+
+        stops = tuple((pos, tuple(color)) for pos, color in self.stops)
+        key = (stops, length, self.horizontal, surf.get_bitsize(), surf.get_masks())
+        line = GRADIENTS.get(key)
+        if line is None:
+            size = (length, 1) if self.horizontal else (1, length)
+            line = pygame.image.frombuffer(ramp(stops, length), size, "RGBA").convert(surf)
+            GRADIENTS.put(key, line)
+        return line
+
     def _paint(self, surf):
         width, height = surf.get_size()
+        if width <= 0 or height <= 0:
+            return
 
-        if self.horizontal:
-            for x in range(width):
-                color = mix(self.color, self.end, 1 - x / (width - 1))
-                pygame.gfxdraw.vline(surf, x, 0, height, color)
-        else:
-            for y in range(height):
-                color = mix(self.color, self.end, 1 - y / (height - 1))
-                pygame.gfxdraw.hline(surf, 0, width, y, color)
+        # Stretching the line along the other direction only copies its pixels
+        line = self.line(width if self.horizontal else height, surf)
+        pygame.transform.scale(line, (width, height), surf)
 
 
 class MultiGradient(Gradient):
@@ -163,57 +234,348 @@ class MultiGradient(Gradient):
         # Should we add the positions too ? How ?
         return "MultiGradient({})".format(" -> ".join(map(str, self.colors)))
 
-    def _paint(self, surf: pygame.Surface):
+    @property
+    def stops(self):
+        return tuple(zip(self.positions, self.colors))
+
+
+class LutGradient(Color):
+    """
+    Base class of the gradients that paint each pixel with a color from a lookup table of the gradient,
+    indexed by a position between 0 and 1 that depends on where the pixel is.
+
+    Those gradients are immutable: their stops and geometry can't be changed once created, so the surfaces
+    they paint are cached in GRADIENTS and shared between all equal gradients.
+    Subclasses define `geometry`, `_positions` to compute the positions with numpy and `_draw` to paint without.
+    """
+
+    LUT_SIZE = 256
+    """Number of colors in the lookup table."""
+
+    def __init__(self, *colors, positions=None):
+        """
+        A gradient going through two or more colors.
+
+        :param colors: RGB or RGBA tuples.
+        :param positions: The position of each color, between 0 and 1. By default, they are equally spaced.
+        """
+
+        assert len(colors) >= 2
+        assert positions is None or len(positions) == len(colors), \
+            "If you define position, give them for each color"
+
+        super().__init__(colors[0])
+
+        if positions is None:
+            # -1 because n points define n-1 ranges
+            positions = [i / (len(colors) - 1) for i in range(len(colors))]
+        stops = ((pos, tuple(color) + (255,) * (4 - len(color))) for pos, color in zip(positions, colors))
+        self._stops = tuple(sorted(stops, key=lambda stop: stop[0]))
+        self._lut = None
+        self._packed_luts = {}  # pixel format -> numpy array of the lut mapped to this format
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, " -> ".join(str(color) for _, color in self._stops))
+
+    def __bool__(self):
+        return any(color[3] for _, color in self._stops)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._stops == other._stops and self.geometry == other.geometry
+
+    def __hash__(self):
+        return hash((type(self), self._stops, self.geometry))
+
+    @property
+    def has_transparency(self):
+        return self.transparency is not None or any(color[3] < 255 for _, color in self._stops)
+
+    @property
+    def stops(self):
+        """The (position, RGBA color) of the gradient, sorted by position."""
+        return self._stops
+
+    @property
+    def geometry(self):
+        """The parameters, besides the stops, that define the gradient."""
+        return ()
+
+    def lut(self):
+        """Return the LUT_SIZE colors of the gradient, from the position 0 to 1, as RGBA tuples."""
+
+        if self._lut is None:
+            line = ramp(self._stops, self.LUT_SIZE)
+            self._lut = [tuple(line[i:i + 4]) for i in range(0, len(line), 4)]
+        return self._lut
+
+    def _paint(self, surf):
         width, height = surf.get_size()
+        if width <= 0 or height <= 0:
+            return
+
+        key = (self, (width, height), surf.get_bitsize(), surf.get_masks())
+        painted = GRADIENTS.get(key)
+        if painted is None:
+            painted = pygame.Surface((width, height), surf.get_flags() & SRCALPHA, surf)
+            if NUMPY and painted.get_bytesize() == 4:
+                self._paint_lut(painted)
+            else:
+                self._draw(painted)
+            GRADIENTS.put(key, painted)
+
+        # Adding to the transparent surface copies the pixels, without alpha blending
+        surf.fill((0, 0, 0, 0))
+        surf.blit(painted, (0, 0), None, BLEND_RGBA_ADD)
+
+    def _paint_lut(self, surf):
+        """Paint a 32 bits surface by indexing the lookup table with the positions of its pixels."""
+
+        key = (surf.get_bitsize(), surf.get_masks())
+        lut = self._packed_luts.get(key)
+        if lut is None:
+            # map_rgb can return negative numbers when the alpha is in the high bits
+            lut = np.array([surf.map_rgb(color) & 0xFFFFFFFF for color in self.lut()], np.uint32)
+            self._packed_luts[key] = lut
+
+        indices = self._positions(*surf.get_size())
+        indices *= self.LUT_SIZE - 1
+        indices += 0.5
+        np.clip(indices, 0, self.LUT_SIZE - 1, out=indices)
+
+        pixels = pygame.surfarray.pixels2d(surf)
+        np.take(lut, indices.astype(np.intp), out=pixels)
+        del pixels  # unlocks the surface
+
+    @staticmethod
+    def _grid(width, height):
+        """Return the coordinates of the centers of the pixels, as arrays of shapes (width, 1) and (1, height)."""
+        return (np.arange(width, dtype=np.float32)[:, None] + 0.5,
+                np.arange(height, dtype=np.float32)[None, :] + 0.5)
+
+    def _positions(self, width, height):
+        """Return a float array of shape (width, height) with the position in the gradient of each pixel."""
+        raise NotImplementedError
+
+    def _draw(self, surf):
+        """Paint the gradient on a surface without numpy."""
+        raise NotImplementedError
+
+
+class LinearGradient(LutGradient):
+    def __init__(self, *colors, positions=None, angle=0):
+        """
+        A linear gradient in any direction, that goes through two or more colors.
+
+        Example for a diagonal gradient from blue on the topleft of a square to red on its bottomright,
+        that is yellow at a third of the way:
+            >>> from graphalama.constants import BLUE, YELLOW, RED
+            >>> LinearGradient(BLUE, YELLOW, RED, positions=(0, 1 / 3, 1), angle=45)
+
+        :param colors: RGB or RGBA tuples.
+        :param positions: The position of each color, between 0 and 1. By default, they are equally spaced.
+        :param angle: The direction of the gradient in degrees, clockwise. 0 is left to right, 90 top to bottom.
+            The first and last positions are on the corners of the surface.
+        """
+
+        super().__init__(*colors, positions=positions)
+        self._angle = angle % 360
 
-        # The idea is that we break the multi color gradient into 2-colors gradients
-        # and then use the Gradient.paint method to paint them
+    @property
+    def angle(self):
+        return self._angle
 
-        if self.horizontal:
-            # beggining if the first color isn't at x=0
-            surf.fill(self.colors[0], (0, 0, round(self.positions[0] * width), height))
+    @property
+    def geometry(self):
+        return self._angle,
 
-            for (start_pos, end_pos, start_color, end_color) in zip(self.positions[:-1],
-                                                                    self.positions[1:],
-                                                                    self.colors[:-1],
-                                                                    self.colors[1:]):
-                start_x = round(start_pos * width)
-                end_x = round(end_pos * width)
+    def _projection(self, width, height):
+        """Return the direction of the gradient and the lowest and highest projections of the corners on it."""
 
-                self.color = start_color
-                self.end = end_color
+        dx, dy = cos(radians(self._angle)), sin(radians(self._angle))
+        corners = (0, width * dx, height * dy, width * dx + height * dy)
+        return dx, dy, min(corners), max(corners)
 
-                super(MultiGradient, self)._paint(surf.subsurface((start_x, 0, end_x - start_x, height)))
+    def _positions(self, width, height):
+        dx, dy, low, high = self._projection(width, height)
+        x, y = self._grid(width, height)
+        return (x * dx + y * dy - low) / (high - low)
 
-            end_pos = round(self.positions[-1] * width)
-            surf.fill(self.colors[-1], (end_pos, 0, width - end_pos, height))
+    def _draw(self, surf):
+        width, height = surf.get_size()
+        dx, dy, low, high = self._projection(width, height)
+        far = width + height
+        lut = self.lut()
+
+        # Each color covers what is before its position, and the next ones cover it, so there is no gap
+        surf.fill(lut[-1])
+        for i in range(len(lut) - 2, -1, -1):
+            pos = low + (high - low) * (i + 0.5) / (len(lut) - 1)
+            x, y = pos * dx, pos * dy
+            pygame.draw.polygon(surf, lut[i], [(x - far * dy, y + far * dx), (x + far * dy, y - far * dx),
+                                               (x + far * dy - far * dx, y - far * dx - far * dy),
+                                               (x - far * dy - far * dx, y + far * dx - far * dy)])
+
+
+class RadialGradient(LutGradient):
+    def __init__(self, *colors, positions=None, center=(0.5, 0.5), radius=None):
+        """
+        A circular gradient that goes through two or more colors from its center.
+
+        :param colors: RGB or RGBA tuples.
+        :param positions: The position of each color, between 0 and 1. By default, they are equally spaced.
+        :param center: The center of the gradient, relative to the size of the surface (0.5, 0.5) is the middle.
+        :param radius: The radius of the last position, in pixels, at least 1. By default it reaches the farthest
+            corner.
+        """
+
+        super().__init__(*colors, positions=positions)
+        self._center = tuple(center)
+        self._radius = radius
+
+    @property
+    def center(self):
+        return self._center
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @property
+    def geometry(self):
+        return self._center, self._radius
+
+    def _center_and_radius(self, width, height):
+        cx, cy = self._center[0] * width, self._center[1] * height
+        if self._radius is not None:
+            radius = self._radius
         else:
+            radius = max(hypot(x - cx, y - cy) for x in (0, width) for y in (0, height))
+
+        # the positions are divided by the radius, and less than a pixel would be only the last color anyway
+        return cx, cy, max(1, radius)
 
-            # beggining if the first color isn't at x=0
-            surf.fill(self.colors[0], (0, 0, width, round(self.positions[0] * height)))
+    def _positions(self, width, height):
+        cx, cy, radius = self._center_and_radius(width, height)
+        x, y = self._grid(width, height)
+        return np.sqrt((x - cx) ** 2 + (y - cy) ** 2) / radius
 
-            for (start_pos, end_pos, start_color, end_color) in zip(self.positions[:-1],
-                                                                    self.positions[1:],
-                                                                    self.colors[:-1],
-                                                                    self.colors[1:]):
-                start_y = round(start_pos * height)
-                end_y = round(end_pos * height)
+    def _draw(self, surf):
+        cx, cy, radius = self._center_and_radius(*surf.get_size())
+        lut = self.lut()
 
-                self.color = start_color
-                self.end = end_color
+        # From the outside to the center, so each circle covers only the inside of the previous one
+        surf.fill(lut[-1])
+        for i in range(len(lut) - 2, -1, -1):
+            pygame.draw.circle(surf, lut[i], (cx, cy), radius * (i + 0.5) / (len(lut) - 1))
 
-                super(MultiGradient, self)._paint(surf.subsurface((0, start_y, width, end_y - start_y)))
 
-            end_pos = round(self.positions[-1] * height)
-            surf.fill(self.colors[-1], (0, end_pos, width, height - end_pos))
+class ConicGradient(LutGradient):
+    def __init__(self, *colors, positions=None, center=(0.5, 0.5), angle=0):
+        """
+        A gradient that goes through two or more colors around its center, like a color wheel.
+
+        :param colors: RGB or RGBA tuples. Repeat the first one at the end for a smooth wheel.
+        :param positions: The position of each color, between 0 and 1. By default, they are equally spaced.
+        :param center: The center of the gradient, relative to the size of the surface (0.5, 0.5) is the middle.
+        :param angle: The direction of the position 0 in degrees, clockwise from the right.
+        """
+
+        super().__init__(*colors, positions=positions)
+        self._center = tuple(center)
+        self._angle = angle % 360
+
+    @property
+    def center(self):
+        return self._center
+
+    @property
+    def angle(self):
+        return self._angle
+
+    @property
+    def geometry(self):
+        return self._center, self._angle
+
+    def _positions(self, width, height):
+        x, y = self._grid(width, height)
+        angles = np.arctan2(y - self._center[1] * height, x - self._center[0] * width)
+        return (angles * (1 / (2 * pi)) - self._angle / 360) % 1
+
+    def _draw(self, surf):
+        width, height = surf.get_size()
+        cx, cy = self._center[0] * width, self._center[1] * height
+        far = width + height
+        lut = self.lut()
+        step = 2 * pi / (len(lut) - 1)
+        start = radians(self._angle)
+
+        # Each slice overlaps the next one by half a step, so there is no gap between them
+        for i, color in enumerate(lut):
+            angles = (start + (i - 0.5) * step, start + (i + 1) * step)
+            pygame.draw.polygon(surf, color, [(cx, cy)] + [(cx + far * cos(a), cy + far * sin(a)) for a in angles])
+
+
+def image_rect(image_rect, surf_rect, mode):
+    """
+    Return where an image is placed on a surface, centered.
+
+    :param pygame.Rect image_rect: The rect of the image
+    :param pygame.Rect surf_rect: The rect of the surface
+    :param mode: CENTER, FIT, FILL or STRETCH, see ImageBrush.
+    """
+
+    img_rect = pygame.Rect(image_rect)
+    if mode == FIT:
+        img_rect = img_rect.fit(surf_rect)
+    elif mode == FILL:
+
+        sr_fit = surf_rect.fit(img_rect)
+        wr = surf_rect.width / sr_fit.width
+        hr = surf_rect.height / sr_fit.height
+
+        ratio = max(wr, hr)
+
+        img_rect.width *= ratio
+        img_rect.height *= ratio
+    elif mode == STRETCH:
+        img_rect = pygame.Rect(surf_rect)
+
+    img_rect.center = surf_rect.center
+    return img_rect
+
+
+def repaint_settled_previews():
+    """
+    Invalidate the widgets painted with a preview whose size settled, so they are painted smoothly.
+
+    Screen.render calls it before each frame. Only the brushes in PREVIEWS are checked, so idle frames cost nothing.
+    """
+
+    for brush in list(PREVIEWS):
+        brush._repaint_if_settled()
 
 
 class ImageBrush(Color):
+    CACHE_SIZE = 8 * 2 ** 20
+    """Budget in bytes of the scaled images kept by each brush."""
+    SETTLE_TIME = 0.2
+    """
+    Seconds after which a size is considered settled. Sizes that change faster than that, like during an
+    interactive resize, are painted with a quick and rough scale, and smoothly once they settle.
+    """
+    DRAG_SIZES = 3
+    """
+    Number of new sizes painted within SETTLE_TIME from which they come from a resize. Less than that are only
+    widgets of different sizes that share the brush.
+    """
+
     def __init__(self, surf, mode=FIT, background=TRANSPARENT):
         """
         Color a surface with an image.
 
-        :param surf: The surface to paint with
+        The scaled images are cached, so painting the same size again only needs a blit.
+
+        :param surf: The surface to paint with, or an AtlasRegion
         :param mode: One of the four constants:
           CENTER: Center the image on the surface without changing the size.
           FIT: Fit the image inside the surface, leaving some space on the edges
@@ -224,9 +586,14 @@ class ImageBrush(Color):
 
         super().__init__(background)
         # self.file = surf
-        self.image = surf  # pygame.image.load(surf).convert_alpha()  # type: pygame.Surface
+        self.image = as_surface(surf)  # type: pygame.Surface
         self.mode = mode
 
+        self._scaled = LRUCache(self.CACHE_SIZE)  # (image, size) -> smoothly scaled image
+        self._new_sizes = {}  # size not in the cache -> perf_counter of the last time it was painted
+        self._preview_time = None  # perf_counter of the last rough scale
+        self._watchers = set()  # callbacks to call once the last preview settled, see watch_preview()
+
     def __repr__(self):
         return "<Brush-{}>".format(self.mode)
 
@@ -234,39 +601,69 @@ class ImageBrush(Color):
         return True
 
     @classmethod
-    def from_file(cls, path, mode=FIT, background=TRANSPARENT):
-        surf = pygame.image.load(path).convert_alpha()
+    def from_file(cls, path, mode=FIT, background=TRANSPARENT, atlas=None):
+        """
+        Create a brush with the image at `path`.
+
+        The image is loaded only once, in the cache IMAGES, or in `atlas` if an Atlas is given.
+        """
+
+        surf = atlas.load(path) if atlas is not None else IMAGES.load(path)
         return cls(surf, mode=mode, background=background)
 
     @property
     def has_transparency(self):
         return True  # I don't know of an easy way to do it
 
-    def _paint(self, surf: pygame.Surface):
-        super()._paint(surf)
+    def watch_preview(self, callback):
+        if self in PREVIEWS:
+            self._watchers.add(callback)
+
+    def _repaint_if_settled(self):
+        if perf_counter() - self._preview_time < self.SETTLE_TIME:
+            return
 
-        surf_rect = surf.get_rect()  # type: pygame.Rect
-        img_rect = self.image.get_rect()  # type: pygame.Rect
-        image = self.image.copy()
+        PREVIEWS.discard(self)
+        watchers, self._watchers = self._watchers, set()
+        for callback in watchers:
+            callback()
 
-        if self.mode == FIT:
-            img_rect = img_rect.fit(surf_rect)
-        elif self.mode == FILL:
+    def scaled(self, size):
+        """
+        Return the image scaled to `size`.
 
-            sr_fit = surf_rect.fit(img_rect)
-            wr = surf_rect.width / sr_fit.width
-            hr = surf_rect.height / sr_fit.height
+        The result is smoothly scaled and cached, except when the sizes change quickly:
+        then it is a rough scale and the callbacks given to watch_preview() are called when it settled.
+        """
 
-            ratio = max(wr, hr)
+        if size == self.image.get_size():
+            return self.image
+
+        key = (self.image, size)
+        image = self._scaled.get(key)
+        if image is not None:
+            return image
+
+        now = perf_counter()
+        self._new_sizes = {new_size: time for new_size, time in self._new_sizes.items()
+                           if now - time < self.SETTLE_TIME}
+        # Only sizes that change count as a resize, not other images at the same size, ie. of an ImageListBrush
+        resizing = size not in self._new_sizes and len(self._new_sizes) >= self.DRAG_SIZES - 1
+        self._new_sizes[size] = now
+        if resizing:
+            self._preview_time = now
+            PREVIEWS.add(self)
+            return pygame.transform.scale(self.image, size)
+
+        image = pygame.transform.smoothscale(self.image, size)
+        self._scaled.put(key, image)
+        return image
 
-            img_rect.width *= ratio
-            img_rect.height *= ratio
-        elif self.mode == STRETCH:
-            img_rect = surf_rect
+    def _paint(self, surf: pygame.Surface):
+        super()._paint(surf)
 
-        img_rect.center = surf_rect.center
-        image = pygame.transform.smoothscale(image, img_rect.size)
-        surf.blit(image, img_rect.topleft)
+        img_rect = image_rect(self.image.get_rect(), surf.get_rect(), self.mode)
+        surf.blit(self.scaled(img_rect.size), img_rect.topleft)
 
 
 class ImageListBrush(ImageBrush):
@@ -274,21 +671,28 @@ class ImageListBrush(ImageBrush):
         """
         Paint a surface with the image from a list. Set index to choose which image
 
-        :param surfs: list of images
+        To show an animation, use sprites.AnimatedImage instead: it changes frames without repainting.
+
+        :param surfs: list of images, surfaces or AtlasRegions
         :param mode: See ImageBrush
         :param background: See ImageBrush
         """
         assert len(surfs), "There should be at least one image."
         super().__init__(surfs[0], mode, background)
 
-        self.images = surfs
+        self.images = [as_surface(surf) for surf in surfs]
         self._index = 0
         self.index = 0
 
     @classmethod
-    def from_files(cls, paths, mode=FIT, background=TRANSPARENT):
-        imgs = [pygame.image.load(path).convert_alpha() for path in paths]
-        cls(imgs, mode=mode, background=background)
+    def from_files(cls, paths, mode=FIT, background=TRANSPARENT, atlas=None):
+        """Create a brush with the images at the given paths, loaded only once. See ImageBrush.from_file."""
+
+        if atlas is not None:
+            imgs = [atlas.load(path) for path in paths]
+        else:
+            imgs = [IMAGES.load(path) for path in paths]
+        return cls(*imgs, mode=mode, background=background)
 
     @property
     def index(self):
@@ -302,12 +706,8 @@ class ImageListBrush(ImageBrush):
 
     @index.setter
     def index(self, value):
-        self.index = value % len(self._files)
+        self._index = value % len(self.images)
 
     def _paint(self, surf: pygame.Surface):
-        # We load the image if it isn't
-        if not self.images[self.index]:
-            self.images[self.index] = pygame.image.load(self._files[self.index]).convert_alpha()
-
         self.image = self.images[self.index]
         super()._paint(surf)
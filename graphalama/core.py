@@ -2,8 +2,11 @@
 In this module are defined all the core concepts of the library.
 You shouldn't need to import or use this module unless you are developping new widgets from scratch.
 """
+from collections import namedtuple, Counter
+from time import perf_counter
 from typing import List, Union
 import logging
+import sys
 
 import pygame
 from pygame.constants import MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION, KEYDOWN, KEYUP
@@ -11,20 +14,97 @@ from pygame.rect import Rect
 from pygame.surface import Surface
 
 from .anim import Anim
-from .colors import Color, to_color
+from .colors import Color, repaint_settled_previews, to_color
 from .constants import *
 from .draw import make_transparent
-from .maths import Pos, clamp
+from .maths import Pos, clamp, subtract_rects
 from .shadow import Shadow
 from .shapes import Rectangle
+from .spatial import RectGrid, SpatialIndex
+from .trace import TRACER
 
 LOGGER = logging.getLogger(__name__)
 
+Geometry = namedtuple("Geometry", ("topleft", "shadow_rect", "background_pos", "content_rect", "render_rect",
+                                   "absolute_topleft"))
+"""
+Cached position of a widget and of its parts. See Widget.geometry.
+
+Positions and rectangles are relative to the topleft of the parent's content, except absolute_topleft.
+"""
+
+
+class RenderStats:
+    """Counters of what was drawn since the last reset, which `Screen.render` does every frame."""
+
+    def __init__(self):
+        self.rendered = 0
+        """Number of widgets whose layers were blited."""
+        self.culled = 0
+        """Number of visible widgets skipped because they were outside the area to draw, not counting their children."""
+        self.rasterized = 0
+        """Number of shadows, backgrounds and contents that were drawn because they were not cached."""
+        self.previous = None  # type: RenderStats
+        """The counters of the previous frame, kept by `reset`, or None before the first one."""
+
+    def __repr__(self):
+        return "RenderStats(rendered={}, culled={}, rasterized={})".format(self.rendered, self.culled, self.rasterized)
+
+    def reset(self):
+        """Start counting a new frame, and keep the counters of the one that ended in `previous`."""
+
+        previous = RenderStats()
+        previous.rendered, previous.culled, previous.rasterized = self.rendered, self.culled, self.rasterized
+        self.previous = previous
+        self.rendered = 0
+        self.culled = 0
+        self.rasterized = 0
+
+
+class WidgetStats:
+    """
+    Cache and drawing statistics of widgets, collected only when `Widget.COLLECT_STATS` is True.
+
+    The layers are "shadow", "background" and "content".
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        """Number of times the cached image of each layer was reused."""
+        self.misses = Counter()
+        """Number of times each layer was redrawn."""
+        self.draw_time = Counter()
+        """Time in seconds spent in draw_shadow, draw_background and draw_content for each layer."""
+        self.invalidations = Counter()
+        """Number of invalidations of each layer, indexed by (cause, layer). The cause is the calling function."""
+
+    def __repr__(self):
+        return "WidgetStats(hits={}, misses={}, draw_time={}, invalidations={})".format(
+            dict(self.hits), dict(self.misses), {layer: round(t, 6) for layer, t in self.draw_time.items()},
+            dict(self.invalidations))
+
+    def __iadd__(self, other):
+        self.hits.update(other.hits)
+        self.misses.update(other.misses)
+        self.draw_time.update(other.draw_time)
+        self.invalidations.update(other.invalidations)
+        return self
+
+    def reset(self):
+        self.hits.clear()
+        self.misses.clear()
+        self.draw_time.clear()
+        self.invalidations.clear()
+
 
 class Widget:
 
     LAST_PLACED_WIDGET = None
     """Last created widget. Used for automatic placement."""
+    RENDER_STATS = RenderStats()
+    """Counts the widgets rendered, culled and rasterized, for every widget."""
+    COLLECT_STATS = False
+    """Whether widgets record their cache hits and misses, drawing time and invalidations in `stats`."""
     ACCEPT_CLICKS = False
     """Whether this widget reacts to click events. It has no impact on the children event handling."""
     ACCEPT_KEYBOARD_INPUT = False
@@ -44,15 +124,32 @@ class Widget:
 
         LOGGER.info("Starting to initialize Widget")
 
+        self._stats = None  # type: WidgetStats
         self._shadow_img = None  # type: pygame.SurfaceType
         self._bg = None  # type: pygame.SurfaceType
         self._content = None  # type: pygame.SurfaceType
+        self._composite = None  # type: pygame.SurfaceType
+        self._composite_offset = Pos(0, 0)
+        self._capped_layers = {}  # layer -> copy with its alpha capped to the transparency
+
+        self.flatten = False
+        """
+        Whether the shadow, background and content are flattened into one cached surface.
+
+        This makes rendering a static widget cost only one blit instead of three,
+        at the cost of an extra surface that is rebuilt every time one of the layers is invalidated.
+        """
+
+        self._dirty = True
+        """Whether the widget needs to be redrawn even if it didn't move. See get_dirty_rects()."""
+        self._drawn_rect = None  # type: pygame.Rect
+        self._geometry = None  # type: Geometry
+        self._spatial_index = None  # type: SpatialIndex
 
         self.children = WidgetList()  # type: Union[WidgetList[Widget], Widget]
 
         """You're not supposed to use this unless you're developping a new widget."""
-        self.parent = None  # type: Widget
-        """Do not set the parent of a widget, only set childs"""
+        self._parent = None  # type: Widget
 
         self._shadow = None
         self.shadow = shadow if shadow is not DEFAULT else Shadow()  # type: Shadow
@@ -63,6 +160,7 @@ class Widget:
             self.shape.size = self.prefered_size
 
         self._pos = None
+        self._anchor = None
         if pos is DEFAULT:
             if Widget.LAST_PLACED_WIDGET:
                 y = Widget.LAST_PLACED_WIDGET.shadow_rect.bottom + 3
@@ -96,7 +194,7 @@ class Widget:
         self.animations = []  # type: List[Anim]
 
         Widget.LAST_PLACED_WIDGET = self
-        LOGGER.info(f"Finished initializing {self}")
+        LOGGER.info("Finished initializing %s", self)
 
     def __repr__(self):
         return "<Widget at {}>".format(self.pos)
@@ -112,6 +210,7 @@ class Widget:
     def shadow(self, value):
         self._shadow = value
         self.invalidate_bg()
+        self.invalidate_layout()
 
     @property
     def shape(self):
@@ -126,6 +225,21 @@ class Widget:
 
         self._shape.widget = self
         self.invalidate()
+        self.invalidate_layout()
+
+    @property
+    def parent(self):
+        """
+        The widget that contains this one.
+
+        Do not set the parent of a widget, only set childs.
+        """
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._parent = value
+        self.invalidate_layout()
 
     def add_child(self, child: "Widget"):
         """Recommended way to add a child to a widget."""
@@ -164,6 +278,13 @@ class Widget:
 
     @property
     def transparency(self):
+        """
+        The opacity of the widget and its children, between 0 and 255, or None if opaque.
+
+        The alpha of every pixel is capped to it, so parts that are already more transparent stay as they are.
+        It is applied to copies of the cached layers when they are blited,
+        so changing it doesn't redraw them (ie. for fade in and out effects).
+        """
         return self._transparency
 
     @transparency.setter
@@ -172,9 +293,10 @@ class Widget:
         if value == 255:
             value = None
         self._transparency = value
+        self._capped_layers = {}
         for child in self.children: child.transparency = value
 
-        self.invalidate()
+        self._dirty = True
 
     @property
     def has_transparency(self):
@@ -206,16 +328,7 @@ class Widget:
             inside = self.shape.is_inside(rel_pos)
 
             if event.type == MOUSEMOTION:
-                if inside and not self.mouse_over:  # Enter
-                    self.mouse_over = True
-                    self.on_mouse_enter(event)
-                    self.on_mouse_move(event)
-                elif inside:  # Moving inside
-                    self.on_mouse_move(event)
-                elif not inside and self.mouse_over:  # Exit
-                    self.mouse_over = False
-                    self.clicked = False
-                    self.on_mouse_exit(event)
+                self.update_mouse_over(event, inside)
 
             elif event.type == MOUSEBUTTONDOWN and self.ACCEPT_CLICKS:
                 if inside:
@@ -246,6 +359,25 @@ class Widget:
 
         return event_used
 
+    def update_mouse_over(self, event, inside):
+        """
+        Handle a MOUSEMOTION event.
+
+        :param event: The MOUSEMOTION event.
+        :param bool inside: Whether the mouse is over the widget's shape.
+        """
+
+        if inside and not self.mouse_over:  # Enter
+            self.mouse_over = True
+            self.on_mouse_enter(event)
+            self.on_mouse_move(event)
+        elif inside:  # Moving inside
+            self.on_mouse_move(event)
+        elif not inside and self.mouse_over:  # Exit
+            self.mouse_over = False
+            self.clicked = False
+            self.on_mouse_exit(event)
+
     def on_click(self, event):
         """Called after the user clicked and released a mouse button over the widget."""
 
@@ -270,21 +402,17 @@ class Widget:
     def on_key_release(self, event):
         """Called when a key is released and the widget has focus."""
 
-    def get_surf_to_update(self):
-        ...
-
     # Drawing methods
 
     @property  # shadow
     def shadow_image(self):
         if not self._shadow_img:
-            self.draw_shadow()
-
-            if self.transparency is not None:
-                make_transparent(self._shadow_img, self.transparency)
+            self._draw_layer("shadow", self.draw_shadow)
 
             # noinspection PyArgumentList
             self._shadow_img = self._shadow_img.convert_alpha()
+        elif Widget.COLLECT_STATS:
+            self.stats.hits["shadow"] += 1
 
         return self._shadow_img
 
@@ -295,7 +423,12 @@ class Widget:
     def invalidate_shadow(self):
         """Force the shadow to redraw."""
 
+        if Widget.COLLECT_STATS:
+            self._count_invalidation(("shadow",))
+
         self._shadow_img = None
+        self._composite = None
+        self._dirty = True
 
     @property  # background
     def background_image(self):
@@ -303,14 +436,15 @@ class Widget:
             # create the surface
             self._bg = pygame.Surface(self.shape.size, pygame.SRCALPHA)
             # and fill it
-            self.draw_background(self._bg)
-
-            # mostly for fade in and out effects
-            if self.transparency is not None:
-                make_transparent(self._bg, self.transparency)
+            self._draw_layer("background", self.draw_background, self._bg)
+            # brushes that painted a quick preview tell when to paint it again
+            self._bg_color.watch_preview(self.invalidate_bg)
+            self._border_color.watch_preview(self.invalidate_bg)
 
             # noinspection PyArgumentList
             self._bg = self._bg.convert_alpha()
+        elif Widget.COLLECT_STATS:
+            self.stats.hits["background"] += 1
 
         return self._bg  # type: pygame.SurfaceType
 
@@ -327,23 +461,46 @@ class Widget:
         if self.bg_color:
             self.bg_color.paint(bg_surf)
 
-            # And shape it correctly
-            shape = self.shape.get_mask()
-            bg_surf.blit(shape, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            # And shape it correctly, only where the mask isn't uniform, which is around the edges for most shapes
+            areas = self.shape.mask_areas()
+            if areas:
+                shape = self.shape.get_mask()
+                for rect in areas:
+                    bg_surf.blit(shape, rect, rect, pygame.BLEND_RGBA_MULT)
 
         # Then we draw the border if we need too
         if self.shape.border and self.border_color:
-            surf = pygame.Surface(bg_surf.get_size(), pygame.SRCALPHA)
-
-            self.border_color.paint(surf)
             mask = self.shape.get_border_mask()
-            surf.blit(mask, (0, 0), None, pygame.BLEND_RGBA_MULT)
-            bg_surf.blit(surf, (0, 0))
+            areas = self.shape.mask_areas(border=True)
+
+            width, height = bg_surf.get_size()
+            if type(self.border_color) is Color and 4 * sum(rect.w * rect.h for rect in areas) < width * height:
+                # A plain color is the same everywhere, so the pieces of the mask are tinted and blited directly,
+                # which is faster than a whole scratch surface unless the border is most of the widget
+                pixel = pygame.Surface((1, 1), pygame.SRCALPHA)
+                self.border_color.paint(pixel)
+                color = pixel.get_at((0, 0))
+                for rect in areas:
+                    piece = mask.subsurface(rect).copy()
+                    piece.fill(color, None, pygame.BLEND_RGBA_MULT)
+                    bg_surf.blit(piece, rect)
+            else:
+                # Gradients and images depend on the size of the surface they paint, so they need a whole one
+                surf = pygame.Surface(bg_surf.get_size(), pygame.SRCALPHA)
+                self.border_color.paint(surf)
+                for rect in areas:
+                    surf.blit(mask, rect, rect, pygame.BLEND_RGBA_MULT)
+                    bg_surf.blit(surf, rect, rect)
 
     def invalidate_bg(self):
         """Force the widget to redraw the background."""
 
+        if Widget.COLLECT_STATS:
+            self._count_invalidation(("background",))
+
         self._bg = None
+        self._composite = None
+        self._dirty = True
 
     @property  # content
     def content_image(self):
@@ -352,14 +509,13 @@ class Widget:
             # create the surface
             self._content = pygame.Surface(self.content_rect.size, pygame.SRCALPHA)
             # and fill it
-            self.draw_content(self._content)
-
-            # mostly for fade in and out effects
-            if self.transparency is not None:
-                make_transparent(self._content, self.transparency)
+            self._draw_layer("content", self.draw_content, self._content)
+            self._color.watch_preview(self.invalidate_content)
 
             # noinspection PyArgumentList
             self._content = self._content.convert_alpha()
+        elif Widget.COLLECT_STATS:
+            self.stats.hits["content"] += 1
 
         return self._content
 
@@ -376,14 +532,86 @@ class Widget:
     def invalidate_content(self):
         """Force the widget to redraw its content."""
 
+        if Widget.COLLECT_STATS:
+            self._count_invalidation(("content",))
+
         self._content = None
+        self._composite = None
+        self._dirty = True
 
     def invalidate(self):
         """Forces the widget to re-draw"""
 
+        if Widget.COLLECT_STATS:
+            self._count_invalidation(("shadow", "background", "content"))
+
         self._shadow_img = None
         self._bg = None
         self._content = None
+        self._composite = None
+        self._dirty = True
+
+    @property
+    def stats(self):
+        """The WidgetStats of this widget, updated only while Widget.COLLECT_STATS is True."""
+        if self._stats is None:
+            self._stats = WidgetStats()
+        return self._stats
+
+    @property
+    def cached_bytes(self):
+        """
+        The memory used by the cached images of the widget, not counting its children.
+
+        That includes the copies of the layers made while the widget has a transparency.
+        """
+
+        images = [self._shadow_img, self._bg, self._content, self._composite, *self._capped_layers.values()]
+        return sum(image.get_bytesize() * image.get_width() * image.get_height() for image in images if image)
+
+    def _draw_layer(self, layer, draw, *args):
+        """Call the draw method of a layer that wasn't cached, and record it in the stats if they are collected."""
+
+        Widget.RENDER_STATS.rasterized += 1
+        if not Widget.COLLECT_STATS:
+            draw(*args)
+            return
+
+        start = perf_counter()
+        draw(*args)
+        self.stats.draw_time[layer] += perf_counter() - start
+        self.stats.misses[layer] += 1
+
+    def _count_invalidation(self, layers):
+        """Record in the stats an invalidation of the layers, caused by the caller of the invalidate method."""
+
+        code = sys._getframe(2).f_code
+        cause = getattr(code, "co_qualname", code.co_name)  # co_qualname is new in python 3.11
+        for layer in layers:
+            self.stats.invalidations[cause, layer] += 1
+
+    @property  # shadow, background and content
+    def composite_image(self):
+        """
+        The shadow, background and content of the widget flattened in one surface, with premultiplied alpha.
+
+        It is blited at `topleft + _composite_offset` and used only if `flatten` is True.
+        """
+
+        if not self._composite:
+            rect = self.render_rect
+            self._composite = pygame.Surface(rect.size, pygame.SRCALPHA)
+
+            # Blending with premultiplied alpha is associative so the result is the same as blitting each layer
+            for image, pos in self._layers():
+                self._composite.blit(image.premul_alpha(), (pos[0] - rect.x, pos[1] - rect.y),
+                                     None, pygame.BLEND_PREMULTIPLIED)
+
+            # noinspection PyArgumentList
+            self._composite = self._composite.convert_alpha()
+            self._composite_offset = Pos(rect.topleft) - self.topleft
+
+        return self._composite
 
     # Rendering
 
@@ -398,63 +626,152 @@ class Widget:
             else:
                 anim.run(self)
 
+    def get_dirty_rects(self, origin=(0, 0)):
+        """
+        Run the pre-render updates and return the areas of the window that need to be redrawn.
+
+        Those are the rectangles where the widget was drawn on the last frame and where it will be drawn now,
+        if it was invalidated, moved, resized or hidden in between. Children are checked too.
+        This is what `Screen.render` uses to redraw only the parts of the window that changed.
+
+        :param origin: The absolute position of the topleft of the surface the widget is rendered on.
+        """
+
+        self.pre_render_update()
+
+        geometry = self.geometry
+        rect = geometry.render_rect.move(origin) if self.visible else None
+        dirty = []
+        if self._dirty or rect != self._drawn_rect:
+            if self._drawn_rect:
+                dirty.append(self._drawn_rect)
+            if rect:
+                dirty.append(rect)
+            self._dirty = False
+            self._drawn_rect = rect
+
+        if self.visible and (self.children or self.children.removed_rects):
+            content_pos = geometry.content_rect.topleft
+            dirty.extend(self.children.get_dirty_rects((origin[0] + content_pos[0], origin[1] + content_pos[1])))
+
+        return dirty
+
+    def _forget_drawn_rect(self, rects):
+        """Add the rect where the widget was last drawn to `rects` and forget it. Used when it is removed."""
+
+        if self._drawn_rect:
+            rects.append(self._drawn_rect)
+        self._drawn_rect = None
+
     def render(self, screen: Surface, rects: List[pygame.Rect] = ()):
         """
         Draw the widget and it's child into the screen.
 
         An optional `rects` can be passed tu update only the rects. It is used for optimized rendering,
         where we want to update only the parts of the screen that have changed during the last frame.
+        The rects are relative to `screen` and must not overlap. In this case, the animations are not run
+        as it is expected that `get_dirty_rects` was called just before, to know which rects to update.
         """
 
-        self.pre_render_update()
+        if not rects:
+            repaint_settled_previews()
+            self.pre_render_update()
+
+        self._render(screen, [Rect(rect) for rect in rects] or None, not rects)
+
+    def _render(self, screen: Surface, rects, pre_render):
+        """
+        Draw the widget and it's child into the screen, only inside the `rects` if they are not None.
+
+        :param bool pre_render: Whether the children need to run `pre_render_update` first.
+        """
 
         # on render we blit the shadow, background, content and every child in this order.
         # I choosed to blit everything everytime as blit operation are somewhat fast
         # and it's a much cleaner code than is each widget was a surface containing their children
         # (were each widget would be blited on their parents
 
-        if self.visible:
+        if not self.visible:
+            return
+
+        stats = Widget.RENDER_STATS
+        clip = screen.get_clip()
+        render_rect = self.geometry.render_rect
 
-            content_surf = None
-            if self.children:
-                clip = screen.get_rect().clip(self.content_rect)
-                content_surf = screen.subsurface(clip)
+        # We skip widgets that are not in the area to draw, which also means that their layers
+        # are not rasterized until they become visible
+        if rects is None:
+            if not render_rect.colliderect(clip):
+                stats.culled += 1
+                return
 
+            self._blit_layers(screen)
+        else:
+            rects = [render_rect.clip(rect) for rect in rects if render_rect.colliderect(rect)]
             if not rects:
-                if self.shadow:
-                    screen.blit(self.shadow_image, self.shadow_blit_pos)
-                if self.bg_color or self.border_color:
-                    screen.blit(self.background_image, self.background_pos)  # background and border
-                if self.has_content:
-                    screen.blit(self.content_image, self.content_pos)  # widget's own content
-                if self.children:
-                    self.children.render(content_surf)
-            else:
+                stats.culled += 1
+                return
 
-                shadow_rect = self.shadow_rect
-                collides = shadow_rect.collidelistall(rects)
-                intersections = [shadow_rect.clip(rects[i]) for i in collides]
+            for rect in rects:
+                screen.set_clip(clip.clip(rect))
+                self._blit_layers(screen)
+            screen.set_clip(clip)
 
-                for child in self.children:
-                    if not child.has_transparency and type(child.shape) is Rectangle:
+        stats.rendered += 1
 
-                        # we don't want to blit stuff if it will be overridden by the child who has as no transparency
-                        for inter in intersections[:]:
-                            if child.background_rect.contains(inter):
-                                child.render(content_surf, inter)
-                            intersections.remove(inter)
+        if self.children:
+            content = screen.get_rect().clip(self.geometry.content_rect)
+            visible_content = clip.clip(content)
+            if visible_content:
+                content_surf = screen.subsurface(content)
+                # the subsurface doesn't inherit the clip of the screen, but children need it to be culled
+                content_surf.set_clip(visible_content.move(-content.x, -content.y))
+                if rects is not None:
+                    rects = [rect.move(-content.x, -content.y) for rect in rects]
+                self.children._render(content_surf, rects, pre_render)
+
+    @property
+    def is_opaque(self):
+        """Whether the background of the widget completely hides what is behind it."""
 
-                for inter in intersections:
+        return self.visible \
+            and type(self.shape) is Rectangle \
+            and bool(self.bg_color) \
+            and not self.shadow \
+            and not self.has_transparency
 
-                    if self.shadow:
-                        screen.blit(self.shadow_image, self.shadow_blit_pos, inter)
-                    if self.bg_color or self.border_color:
-                        screen.blit(self.background_image, self.background_pos, inter)  # background and border
-                    if self.has_content:
-                        screen.blit(self.content_image, self.content_pos, inter)  # widget's own content
-                    if self.children:
-                        print(content_surf.get_size())
-                        self.children.render(content_surf)
+    def _layers(self):
+        """Yield the images of the shadow, background and content that are drawn, with their blit position."""
+
+        geometry = self.geometry
+        if self.shadow:
+            yield self.shadow_image, geometry.shadow_rect.topleft
+        if self.bg_color or self.border_color:
+            yield self.background_image, geometry.background_pos  # background and border
+        if self.has_content:
+            yield self.content_image, geometry.content_rect.topleft  # widget's own content
+
+    def _blit_layers(self, screen):
+        """Blit the shadow, background and content of the widget, but not its children."""
+
+        if self.transparency is None:
+            if self.flatten:
+                composite = self.composite_image
+                screen.blit(composite, self.topleft + self._composite_offset, None, pygame.BLEND_PREMULTIPLIED)
+            else:
+                for image, pos in self._layers():
+                    screen.blit(image, pos)
+        else:
+            # The cached layers stay opaque, only their capped copies are redone when a layer changes
+            capped_layers = {}
+            for image, pos in self._layers():
+                capped = self._capped_layers.get(image)
+                if capped is None:
+                    capped = image.copy()
+                    make_transparent(capped, self.transparency)
+                capped_layers[image] = capped
+                screen.blit(capped, pos)
+            self._capped_layers = capped_layers
 
     # Pos, size, anchor
 
@@ -466,6 +783,18 @@ class Widget:
     @pos.setter
     def pos(self, value):
         self._pos = value
+        self._dirty = True
+        self.invalidate_layout()
+
+    @property
+    def anchor(self):
+        """The sides where the widget is anchored, see `resize`."""
+        return self._anchor
+
+    @anchor.setter
+    def anchor(self, value):
+        self._anchor = value
+        self.invalidate_layout()
 
     def resize(self, new_screen_size, past_screen_size):
         """
@@ -531,92 +860,146 @@ class Widget:
         for child in self.children:
             child.resize(self.shape.content_rect().size, previous_size)
 
+    # Geometry
+
     @property
-    def absolute_topleft(self):
-        """Position of the topleft of the background inside the whole window."""
+    def geometry(self):
+        """
+        The position of the widget and of its parts, computed once and cached until it moves.
+
+        All the position properties (x, topleft, content_rect, absolute_rect...) use it.
+        """
+
+        if self._geometry is None:
+            self._geometry = self.layout()
+        return self._geometry
+
+    def layout(self):
+        """Compute the position of the widget and of its parts. Use the cached `geometry` instead."""
+
+        width, height = self.shape.size
+
+        if self.anchor & LEFT and self.anchor & RIGHT:
+            x = self.pos[0] - width // 2
+        elif self.anchor & LEFT:
+            x = self.pos[0]
+        elif self.anchor & RIGHT:
+            x = self.pos[0] - width
+        else:
+            x = self.pos[0] - width // 2
+
+        if self.anchor & TOP and self.anchor & BOTTOM:
+            y = self.pos[1] - height // 2
+        elif self.anchor & TOP:
+            y = self.pos[1]
+        elif self.anchor & BOTTOM:
+            y = self.pos[1] - height
+        else:
+            y = self.pos[1] - height // 2
+
+        shadow_offset = self.shadow.offset
+        shadow_size = self.shadow.extra_size
+        shadow_rect = Rect(x - shadow_offset.left, y - shadow_offset.top,
+                           width + shadow_size[0], height + shadow_size[1])
+
+        bg_offset = self.shape.bg_offset
+        background_pos = Pos(x + bg_offset[0], y + bg_offset[1])
+
+        content_rect = self.shape.content_rect()
+        content_rect.move_ip(x, y)
 
         if self.parent:
-            par_tl = self.parent.absolute_topleft
-            pitl = self.parent.shape.content_rect().topleft
-            return Pos(par_tl[0] + pitl[0] + self.x,
-                       par_tl[1] + pitl[1] + self.y)
+            # The children are placed relatively to the parent's content
+            parent_geometry = self.parent.geometry
+            absolute_x = parent_geometry.absolute_topleft[0] + parent_geometry.content_rect.x \
+                - parent_geometry.topleft[0] + x
+            absolute_y = parent_geometry.absolute_topleft[1] + parent_geometry.content_rect.y \
+                - parent_geometry.topleft[1] + y
         else:
-            return self.topleft
+            absolute_x, absolute_y = x, y
+
+        return Geometry(Pos(x, y),
+                        shadow_rect,
+                        background_pos,
+                        content_rect,
+                        shadow_rect.union((background_pos, (width, height))),
+                        Pos(absolute_x, absolute_y))
+
+    def invalidate_layout(self):
+        """Force the widget and its children to be placed again, when their position or size changed."""
+
+        # The children are placed only after their parent, so if it's not placed neither are they
+        if self._geometry is not None:
+            self._geometry = None
+            if self._spatial_index is not None:
+                self._spatial_index.moved(self)
+            for child in self.children:
+                child.invalidate_layout()
+
+    @property
+    def absolute_topleft(self):
+        """Position of the topleft of the background inside the whole window."""
+        return self.geometry.absolute_topleft
 
     @property
     def absolute_rect(self):
         """Rectangle containing the widget (its background) inside the whole window."""
-
-        return pygame.Rect(self.absolute_topleft, self.size)
+        return Rect(self.geometry.absolute_topleft, self.size)
 
     @property
     def x(self):
         """X position relative to its parent (or the left of the window if it has no parent)"""
-
-        if self.anchor & LEFT and self.anchor & RIGHT:
-            return self.pos[0] - self.shape.width // 2
-        elif self.anchor & LEFT:
-            return self.pos[0]
-        elif self.anchor & RIGHT:
-            return self.pos[0] - self.shape.width
-        else:
-            return self.pos[0] - self.shape.width // 2
+        return self.geometry.topleft[0]
 
     @property
     def y(self):
         """Y position relative to its parent (or the top of the window if it has no parent)"""
-
-        if self.anchor & TOP and self.anchor & BOTTOM:
-            return self.pos[1] - self.shape.height // 2
-        elif self.anchor & TOP:
-            return self.pos[1]
-        elif self.anchor & BOTTOM:
-            return self.pos[1] - self.shape.height
-        else:
-            return self.pos[1] - self.shape.height // 2
+        return self.geometry.topleft[1]
 
     @property
     def topleft(self):
         """Position of the background relative the the parent's topleft (or the window topleft if no parent)."""
-
-        return Pos(self.x, self.y)
+        return self.geometry.topleft
 
     @property
     def shadow_blit_pos(self):
         """Position of the shadow relative the parent's top left corner."""
-
-        return Pos(self.x - self.shadow.offset.left,
-                   self.y - self.shadow.offset.top)
+        return Pos(self.geometry.shadow_rect.topleft)
 
     @property
     def shadow_blit_size(self):
         """Size of the shadow"""
-        return self.size + self.shadow.extra_size
+        return Pos(self.geometry.shadow_rect.size)
 
     @property
     def shadow_rect(self):
         """The shadow's rectangle relative to the topleft corner of the parent."""
-        return Rect(self.shadow_blit_pos, self.shadow_blit_size)
+        return self.geometry.shadow_rect.copy()
+
+    @property
+    def render_rect(self):
+        """The rectangle where the widget draws its shadow, background and content, relative to its parent."""
+        return self.geometry.render_rect.copy()
 
     @property
     def background_pos(self):
         """Position of the background relative the parent's top left corner."""
-        return self.topleft + self.shape.bg_offset
+        return self.geometry.background_pos
 
     @property
     def background_rect(self):
         """Rectangle containing the background, relatively to the widget's parent"""
-        return Rect(self.topleft, self.size)
+        return Rect(self.geometry.topleft, self.size)
 
     @property
     def content_pos(self):
         """Position of the content relative the parent's top left corner."""
-        return self.topleft + self.shape.content_rect().topleft
+        return Pos(self.geometry.content_rect.topleft)
 
     @property
     def content_rect(self):
         """Position of the content rectangle relative the parent's top left corner."""
-        return Rect(self.content_pos, self.shape.content_rect().size)
+        return self.geometry.content_rect.copy()
 
     @staticmethod
     def anchor_to_rect_attr(anchor):
@@ -640,14 +1023,128 @@ class Widget:
         return d.get(anchor, "center")
 
 
+def _changes_structure(method, removed=None):
+    """
+    Wrap a list method so the spatial index containing the list is rebuilt when it is called.
+
+    :param removed: For methods that can remove widgets, a function of the arguments of the method
+        that returns the items it will remove. The rects where they were drawn then need to be redrawn.
+    """
+
+    def inner(self, *args, **kwargs):
+        if self.spatial_index is not None:
+            self.spatial_index.invalidate()
+        if removed is None:
+            return method(self, *args, **kwargs)
+
+        items = removed(self, *args, **kwargs)
+        result = method(self, *args, **kwargs)
+        for item in items:
+            for w in item.walk() if isinstance(item, WidgetList) else (item, *item.children.walk()):
+                w._forget_drawn_rect(self.removed_rects)
+        return result
+
+    inner.__name__ = method.__name__
+    inner.__doc__ = method.__doc__
+    return inner
+
+
+def _items_at(self, key, *args):
+    """The items at an index or a slice of a list."""
+    return self[key] if isinstance(key, slice) else [self[key]]
+
+
 class WidgetList(list):
 
+    spatial_index = None  # type: SpatialIndex
+    """The SpatialIndex that contains the widgets of the list, if any. It is set by the index."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.removed_rects = []
+        """Where the widgets removed from the list were drawn, to redraw on the next frame."""
+
+    append = _changes_structure(list.append)
+    extend = _changes_structure(list.extend)
+    insert = _changes_structure(list.insert)
+    remove = _changes_structure(list.remove, lambda self, item: [item])
+    pop = _changes_structure(list.pop, lambda self, index=-1: [self[index]])
+    clear = _changes_structure(list.clear, lambda self: list(self))
+    sort = _changes_structure(list.sort)
+    reverse = _changes_structure(list.reverse)
+    __setitem__ = _changes_structure(list.__setitem__, _items_at)
+    __delitem__ = _changes_structure(list.__delitem__, _items_at)
+    __iadd__ = _changes_structure(list.__iadd__)
+    __imul__ = _changes_structure(list.__imul__, lambda self, times: list(self) if times <= 0 else [])
+
     def __bool__(self):
         return len(self) > 0
 
-    def render(self, screen):
+    def walk(self):
+        """Yield every widget of the list and of the nested lists, with all their children."""
+
+        for item in self:
+            if isinstance(item, WidgetList):
+                yield from item.walk()
+            else:
+                yield item
+                yield from item.children.walk()
+
+    def get_dirty_rects(self, origin=(0, 0)):
+        rects = self.removed_rects
+        self.removed_rects = []
         for w in self:
-            w.render(screen)
+            rects.extend(w.get_dirty_rects(origin))
+        return rects
+
+    def render(self, screen, rects=()):
+        if not rects:
+            repaint_settled_previews()
+        self._render(screen, [Rect(rect) for rect in rects] or None, not rects)
+
+    def _render(self, screen, rects, pre_render):
+        """Render the widgets, only inside the `rects` if they are not None. See Widget._render."""
+
+        if pre_render:
+            for w in self:
+                if not isinstance(w, WidgetList):
+                    w.pre_render_update()
+
+        widgets = [w for w in self if isinstance(w, WidgetList) or w.visible]
+
+        # Parts of a widget hidden by an opaque widget rendered after it don't need to be drawn
+        # So we go through the widgets backwards and remember the places already covered
+        area = screen.get_clip()
+        hidden_parts = []
+        covered = RectGrid()
+        for w in reversed(widgets):
+            if isinstance(w, WidgetList):
+                hidden_parts.append(())
+                continue
+
+            render_rect = w.geometry.render_rect
+            if not render_rect.colliderect(area):
+                # it will be culled anyway
+                hidden_parts.append(())
+                continue
+
+            hidden_parts.append(covered.colliding(render_rect) if covered else ())
+            if w.is_opaque:
+                rect = Rect(w.geometry.background_pos, w.size).clip(area)
+                if rect:
+                    covered.insert(rect)
+
+        for w, hidden in zip(widgets, reversed(hidden_parts)):
+            start = perf_counter() if TRACER.enabled else None
+
+            if hidden:
+                w._render(screen, subtract_rects([area] if rects is None else rects, hidden), pre_render)
+            else:
+                w._render(screen, rects, pre_render)
+
+            if start is not None:
+                TRACER.add_span(type(w).__name__, "widget", start,
+                                None if isinstance(w, WidgetList) else {"widget": repr(w)})
 
     def update(self, event):
         for w in self:
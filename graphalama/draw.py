@@ -5,15 +5,23 @@ This is a module for easy drawings.
 Every function provides anti-aliased shapes.
 """
 
-__all__ = ['circle', 'line', 'polygon', 'ring', 'roundrect', "blured", "greyscaled", "make_transparent"]
+__all__ = ['circle', 'disc', 'line', 'nine_slice', 'polygon', 'ring', 'roundrect', "blured", "greyscaled", "make_transparent"]
 
 import pygame
 from pygame import gfxdraw
-from pygame.constants import SRCALPHA, BLEND_RGBA_MAX, BLEND_RGBA_MIN
+from pygame.constants import SRCALPHA, BLEND_RGBA_MULT, BLEND_RGBA_ADD
 from pygame.math import Vector2
 
+from .cache import LRUCache
 from .constants import BLACK
 
+try:
+    import numpy as np
+except (ImportError, ModuleNotFoundError):
+    NUMPY = False
+else:
+    NUMPY = True
+
 try:
     from PIL import Image, ImageFilter
 except (ImportError, ModuleNotFoundError):
@@ -175,32 +183,22 @@ def roundrect(surface, rect, color, rounding=5, percent=False):
         rounding = int(min(rect.size) * rounding / 100)
 
     rect = pygame.Rect(rect)
-    color = pygame.Color(*color)
-    alpha = color.a
-    color.a = 0
-    pos = rect.topleft
-    rect.topleft = 0, 0
+    rounding = max(0, min(rounding, *rect.size))
     rectangle = pygame.Surface(rect.size, SRCALPHA)
+    rectangle.fill(color)
 
-    circle = pygame.Surface([min(rect.size) * 3] * 2, SRCALPHA)
-    pygame.draw.ellipse(circle, (0, 0, 0), circle.get_rect(), 0)
-    circle = pygame.transform.smoothscale(circle, (rounding, rounding))
-
-    rounding = rectangle.blit(circle, (0, 0))
-    rounding.bottomright = rect.bottomright
-    rectangle.blit(circle, rounding)
-    rounding.topright = rect.topright
-    rectangle.blit(circle, rounding)
-    rounding.bottomleft = rect.bottomleft
-    rectangle.blit(circle, rounding)
+    # Each corner is cut by a quarter of the disc. Blending with a multiplication is much faster than
+    # filling with BLEND_RGBA_MIN/MAX, and only touches the corners.
+    circle = disc(rounding)
+    half = rounding // 2
+    other = rounding - half
+    w, h = rect.size
+    rectangle.blit(circle, (0, 0), (0, 0, half, half), BLEND_RGBA_MULT)
+    rectangle.blit(circle, (w - other, 0), (half, 0, other, half), BLEND_RGBA_MULT)
+    rectangle.blit(circle, (0, h - other), (0, half, half, other), BLEND_RGBA_MULT)
+    rectangle.blit(circle, (w - other, h - other), (half, half, other, other), BLEND_RGBA_MULT)
 
-    rectangle.fill((0, 0, 0), rect.inflate(-rounding.w, 0))
-    rectangle.fill((0, 0, 0), rect.inflate(0, -rounding.h))
-
-    rectangle.fill(color, special_flags=BLEND_RGBA_MAX)
-    rectangle.fill((255, 255, 255, alpha), special_flags=BLEND_RGBA_MIN)
-
-    return surface.blit(rectangle, pos)
+    return surface.blit(rectangle, rect)
 
 
 def circle2(surface, xy, r, color):
@@ -213,17 +211,100 @@ def circle2(surface, xy, r, color):
     r  : 0 <= radius <= 1
     """
 
-    color = pygame.Color(*color)
-    alpha = color.a
-    color.a = 0
+    circle = pygame.Surface((2 * r, 2 * r), SRCALPHA)
+    circle.fill(color)
+    circle.blit(disc(2 * r), (0, 0), None, BLEND_RGBA_MULT)
+    return surface.blit(circle, xy)
 
-    circle = pygame.Surface([r * 3] * 2, SRCALPHA)
-    pygame.draw.ellipse(circle, (0, 0, 0, 255), circle.get_rect(), 0)
-    circle = pygame.transform.smoothscale(circle, (2 * r, 2 * r))
 
-    circle.fill(color, special_flags=BLEND_RGBA_MAX)
-    circle.fill((255, 255, 255, alpha), special_flags=BLEND_RGBA_MIN)
-    return surface.blit(circle, xy)
+DISCS = LRUCache(8 * 2 ** 20)
+"""The discs drawn by `disc`, indexed by diameter. Its budget is in bytes."""
+
+
+def disc(diameter):
+    """
+    Return a white antialiased disc whose alpha is the fraction of each pixel covered by the disc.
+
+    Discs are cached, so don't modify the returned surface, copy it first.
+    """
+
+    diameter = int(diameter)
+    surf = DISCS.get(diameter)
+    if surf is None:
+        surf = _draw_disc(diameter)
+        DISCS.put(diameter, surf)
+    return surf
+
+
+def _draw_disc(diameter):
+    surf = pygame.Surface((diameter, diameter), SRCALPHA)
+    surf.fill((255, 255, 255, 0))
+    if diameter <= 0:
+        return surf
+
+    if not NUMPY:
+        # Without numpy, we draw a bigger disc and scale it down to antialias it
+        big = pygame.Surface((diameter * 3, diameter * 3), SRCALPHA)
+        big.fill((255, 255, 255, 0))
+        pygame.draw.ellipse(big, (255, 255, 255, 255), big.get_rect(), 0)
+        return pygame.transform.smoothscale(big, (diameter, diameter))
+
+    # The coverage of a pixel is approximated by the distance from its center to the circle,
+    # which is exact for a straight edge and very close for a curve larger than a pixel
+    radius = diameter / 2
+    centers = np.arange(diameter) + 0.5 - radius
+    distance = np.hypot(centers[:, None], centers[None, :])
+    coverage = np.clip(radius - distance + 0.5, 0, 1)
+
+    alpha = pygame.surfarray.pixels_alpha(surf)
+    alpha[:] = (coverage * 255 + 0.5).astype(np.uint8)
+    del alpha  # unlock the surface
+    return surf
+
+
+def nine_slice(tile, insets, size):
+    """
+    Return a surface of the given size made from a tile whose corners are kept as they are,
+    whose edges are stretched along the sides and whose middle is stretched in both directions.
+
+    The cost is proportional to the perimeter of the surface, plus filling its middle.
+    :param pygame.Surface tile: The image to stretch
+    :param insets: The sizes (left, top, right, bottom) of the corners of the tile.
+    :param size: The size of the returned surface. It must be at least left + right by top + bottom.
+    """
+
+    left, top, right, bottom = insets
+    tile_width, tile_height = tile.get_size()
+    width, height = size
+
+    # (position in the tile, size in the tile, position in the surface, size in the surface)
+    columns = ((0, left, 0, left),
+               (left, tile_width - left - right, left, width - left - right),
+               (tile_width - right, right, width - right, right))
+    rows = ((0, top, 0, top),
+            (top, tile_height - top - bottom, top, height - top - bottom),
+            (tile_height - bottom, bottom, height - bottom, bottom))
+
+    surf = pygame.Surface(size, SRCALPHA)
+    for tile_x, tile_w, x, w in columns:
+        for tile_y, tile_h, y, h in rows:
+            if w <= 0 or h <= 0 or tile_w <= 0 or tile_h <= 0:
+                continue
+
+            if tile_w == tile_h == 1:
+                # Stretching a single pixel is just filling, and the surface is already transparent
+                color = tile.get_at((tile_x, tile_y))
+                if color.a:
+                    surf.fill(color, (x, y, w, h))
+                continue
+
+            part = tile.subsurface((tile_x, tile_y, tile_w, tile_h))
+            if (tile_w, tile_h) != (w, h):
+                part = pygame.transform.scale(part, (w, h))
+            # Adding to the transparent surface copies the pixels, without alpha blending
+            surf.blit(part, (x, y), None, BLEND_RGBA_ADD)
+
+    return surf
 
 
 def polygon(surf, points, color):
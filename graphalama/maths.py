@@ -30,45 +30,95 @@ def merge_rects(rect1, rect2):
     return pygame.Rect(x, y, right - x, bot - y)
 
 
+def merge_overlapping_rects(rects):
+    """Return a list of rects that cover the same area as `rects`, where overlapping rects were merged together."""
+
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        # a merged rect can overlap rects that were merged before, so we go until none overlaps
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+
+    return merged
+
+
+def subtract_rects(rects, holes):
+    """Return a list of non overlapping rects that cover the area of `rects` except for the `holes`."""
+
+    pieces = [pygame.Rect(rect) for rect in rects]
+    for hole in holes:
+        remaining = []
+        for piece in pieces:
+            if not piece.colliderect(hole):
+                remaining.append(piece)
+                continue
+
+            # We cut the piece in at most four parts around the hole: above, below, left and right
+            inter = piece.clip(hole)
+            if inter.top > piece.top:
+                remaining.append(pygame.Rect(piece.left, piece.top, piece.width, inter.top - piece.top))
+            if inter.bottom < piece.bottom:
+                remaining.append(pygame.Rect(piece.left, inter.bottom, piece.width, piece.bottom - inter.bottom))
+            if inter.left > piece.left:
+                remaining.append(pygame.Rect(piece.left, inter.top, inter.left - piece.left, inter.height))
+            if inter.right < piece.right:
+                remaining.append(pygame.Rect(inter.right, inter.top, piece.right - inter.right, inter.height))
+        pieces = remaining
+
+    return pieces
+
+
 class Pos(namedtuple("Pos", ('x', 'y'))):
-    """A vector."""
+    """
+    A vector.
+
+    It is a tuple (x, y), so it can be used anywhere pygame expects a position,
+    and it is immutable, so it can safely be cached and shared.
+    That's why it has no in-place operations: `pos += offset` makes a new Pos.
+    """
 
-    def __new__(cls, *c):
-        if len(c) == 0:
-            c = (0, 0)
-        elif len(c) == 1:
-            assert len(c[0]) == 2
-            c = c[0]
-        elif len(c) > 2:
-            raise TypeError
+    __slots__ = ()
 
-        # noinspection PyArgumentList
-        return tuple.__new__(cls, c)
+    def __new__(cls, x=(0, 0), y=None):
+        if y is not None:
+            return _new_tuple(cls, (x, y))
+
+        # Pos(), Pos((x, y)) or Pos(other_vector)
+        c = tuple(x)
+        if len(c) != 2:
+            raise TypeError("Pos accepts a sequence of two coordinates, not {}".format(len(c)))
+        return _new_tuple(cls, c)
+
+    # The operations don't go through __new__ as we know we have exactly two coordinates
 
     def __add__(self, other):
-        return Pos(self[0] + other[0], self[1] + other[1])
+        return _new_tuple(Pos, (self[0] + other[0], self[1] + other[1]))
 
     __radd__ = __add__
 
     def __sub__(self, other):
-        return Pos(self[0] - other[0], self[1] - other[1])
+        return _new_tuple(Pos, (self[0] - other[0], self[1] - other[1]))
 
     def __rsub__(self, other):
-        return Pos(other[0] - self[0], other[1] - self[1])
+        return _new_tuple(Pos, (other[0] - self[0], other[1] - self[1]))
 
     def __neg__(self):
-        return Pos(-self[0], -self[1])
+        return _new_tuple(Pos, (-self[0], -self[1]))
 
     def __mul__(self, other):
-        return Pos(self[0] * other, self[1] * other)
+        return _new_tuple(Pos, (self[0] * other, self[1] * other))
 
     __rmul__ = __mul__
 
     def __truediv__(self, other: int):
-        return Pos(self[0] / other, self[1] / other)
+        return _new_tuple(Pos, (self[0] / other, self[1] / other))
 
     def __floordiv__(self, other: int):
-        return Pos(self[0] // other, self[1] // other)
+        return _new_tuple(Pos, (self[0] // other, self[1] // other))
 
     @property
     def t(self):
@@ -94,3 +144,5 @@ class Pos(namedtuple("Pos", ('x', 'y'))):
         return Pos(c*self[0] + s*self[1],
                    s*self[0] - c*self[1])
 
+
+_new_tuple = tuple.__new__
@@ -0,0 +1,157 @@
+"""
+This module provides PerfOverlay, a widget that shows how well the screen it is on performs.
+"""
+
+from collections import deque
+from time import perf_counter
+import logging
+
+import pygame
+
+from .constants import DEFAULT, TOPLEFT, WHITE
+from .core import RenderStats, Widget
+from .draw import make_transparent
+from .font import default_font
+from .shadow import NoShadow
+from .shapes import Rectangle
+from .trace import nearest_rank
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PerfOverlay(Widget):
+    """
+    A panel that shows the FPS, the median and 99th percentile of the frame time, the number of widgets
+    rendered and culled and of layers rasterized in the last frame, and the memory used by the cached layers.
+
+    Add it last to the widgets of a screen so it is drawn on top of them:
+
+        screen.widgets.append(PerfOverlay(screen))
+
+    The overlay doesn't render its text with a new surface each time: the glyphs are rendered once and blited
+    one by one, so it doesn't count in the rasterized layers it shows and it can be left on in production.
+    """
+
+    REFRESH_INTERVAL = 0.5
+    """Seconds between two updates of the numbers shown."""
+    FRAMES = 120
+    """Number of frames used to compute the FPS and the percentiles."""
+    LINES = ("fps 000.0", "p50 00.0 ms p99 00.0 ms", "rendered 0000 culled 0000", "rasterized 0000", "cache 0000.0 MB")
+    """Lines as large as the displayed ones, to compute the size of the overlay."""
+
+    def __init__(self, screen, pos=DEFAULT, color=DEFAULT, bg_color=DEFAULT, font=DEFAULT, anchor=DEFAULT):
+        """
+        A panel showing performance statistics about the screen.
+
+        :param Screen screen: The screen whose widgets are measured.
+        """
+
+        LOGGER.info("Starting to initialize PerfOverlay")
+
+        self.screen = screen
+        self.font = font if font else default_font(14)
+
+        self._glyphs = {}  # char -> surface
+        self._frame_times = deque(maxlen=self.FRAMES)
+        self._last_frame = None  # perf_counter of the last pre_render_update
+        self._last_refresh = None
+        self._lines = None  # type: list
+        self._cached_bytes = 0
+
+        if pos is DEFAULT:
+            pos = (5, 5)
+        if color is DEFAULT:
+            color = WHITE
+        if bg_color is DEFAULT:
+            bg_color = (0, 0, 0, 160)
+        if anchor is DEFAULT:
+            anchor = TOPLEFT
+
+        super().__init__(pos, Rectangle(padding=4), color, bg_color, (0, 0, 0, 0), NoShadow(), anchor)
+        LOGGER.info("Finished initializing %s", self)
+
+    def __repr__(self):
+        return "<PerfOverlay at {}>".format(self.pos)
+
+    @property
+    def prefered_size(self):
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in self.LINES)
+        return self.shape.widget_size_from_content_size((width, line_height * len(self.LINES)))
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        Widget.color.fset(self, value)
+        self._glyphs = {}
+
+    def pre_render_update(self):
+        super().pre_render_update()
+
+        now = perf_counter()
+        if self._last_frame is not None:
+            self._frame_times.append(now - self._last_frame)
+        self._last_frame = now
+
+        if self._last_refresh is None or now - self._last_refresh >= self.REFRESH_INTERVAL:
+            self._last_refresh = now
+            # The memory is measured only at each refresh as it needs to visit every widget
+            self._lines = None
+            self._cached_bytes = sum(widget.cached_bytes for widget in self.screen.widgets.walk())
+            self._dirty = True
+
+    def format_lines(self):
+        """Return the lines of text to display."""
+
+        # The counters of this frame are still incomplete, and they would count the repaint of the overlay itself
+        stats = Widget.RENDER_STATS.previous or RenderStats()
+        times = nearest_rank(self._frame_times, (50, 99))
+        if times:
+            fps = len(self._frame_times) / sum(self._frame_times)
+            p50, p99 = times[50] * 1000, times[99] * 1000
+        else:
+            fps = p50 = p99 = 0
+
+        return [
+            "fps {:.1f}".format(fps),
+            "p50 {:.1f} ms p99 {:.1f} ms".format(p50, p99),
+            "rendered {} culled {}".format(stats.rendered, stats.culled),
+            "rasterized {}".format(stats.rasterized),
+            "cache {:.1f} MB".format(self._cached_bytes / 2 ** 20),
+        ]
+
+    def glyph(self, char):
+        """Return the image of a character, rendered only the first time."""
+
+        image = self._glyphs.get(char)
+        if image is None:
+            text = self.font.render(char, True, (255, 255, 255, 255))
+            image = pygame.Surface(text.get_size(), pygame.SRCALPHA)
+            self.color.paint(image)
+            image.blit(text, (0, 0), None, pygame.BLEND_RGBA_MULT)
+            # noinspection PyArgumentList
+            image = image.convert_alpha()
+            self._glyphs[char] = image
+        return image
+
+    def _blit_layers(self, screen):
+        super()._blit_layers(screen)
+
+        if self._lines is None:
+            self._lines = self.format_lines()
+
+        x0, y = self.geometry.content_rect.topleft
+        line_height = self.font.get_linesize()
+        for line in self._lines:
+            x = x0
+            for char in line:
+                image = self.glyph(char)
+                if self.transparency is not None:
+                    image = image.copy()
+                    make_transparent(image, self.transparency)
+                screen.blit(image, (x, y))
+                x += image.get_width()
+            y += line_height
@@ -6,6 +6,7 @@ A shape class defines two important methods:
  - `get_mask` that creates a white surface of a given size
    with different levels of transparency for gradients and
    a transparency of 0 when a pixel is outside of the shape.
+   Masks are shared between identical shapes through the MASKS cache.
  - `is_inside` to tell if a pixel is inside the shape.
 
 """
@@ -15,11 +16,19 @@ from typing import TYPE_CHECKING
 
 import pygame.examples.fonty
 
+from .cache import LRUCache, surface_bytes
 from .maths import Pos
 from .constants import DEFAULT
-from .draw import roundrect, polygon
+from .draw import roundrect, polygon, nine_slice
 from .maths import clamp
 
+try:
+    import numpy as np
+except (ImportError, ModuleNotFoundError):
+    NUMPY = False
+else:
+    NUMPY = True
+
 if TYPE_CHECKING:
     from .core import Widget
 
@@ -30,6 +39,74 @@ HALFSQRT2 = 0.709
 Margins = namedtuple("Margins", ("left", "top", "right", "bottom"))
 
 
+class NineSlice(namedtuple("NineSlice", ("tile", "insets", "edges"))):
+    """
+    A mask as a small tile whose corners (of sizes `insets`) are the corners of the mask
+    and whose middle row and column can be stretched to make the mask at any size.
+
+    `edges` are the thicknesses, from the outside, of the parts of the sides that are not
+    the same as the middle of the tile. Use from_tile to compute them.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_tile(cls, tile, insets):
+        left, top, right, bottom = insets
+        width, height = tile.get_size()
+        middle = tile.get_at((left, top))
+
+        def thickness(points):
+            # the points go from the outside to the middle
+            different = [i for i, point in enumerate(points) if tile.get_at(point) != middle]
+            return different[-1] + 1 if different else 0
+
+        edges = Margins(thickness([(x, top) for x in range(left)]),
+                        thickness([(left, y) for y in range(top)]),
+                        thickness([(x, top) for x in range(width - 1, width - right - 1, -1)]),
+                        thickness([(left, y) for y in range(height - 1, height - bottom - 1, -1)]))
+        return cls(tile, Margins(*insets), edges)
+
+    def edges_rects(self, size):
+        """
+        Return the rectangles of a mask of the given size that are not the same as the middle of the tile.
+
+        Those are the corners and the parts of the sides given by `edges`.
+        """
+
+        width, height = size
+        left, top, right, bottom = self.insets
+        middle_width = width - left - right
+        middle_height = height - top - bottom
+        rects = [pygame.Rect(0, 0, left, top),
+                 pygame.Rect(width - right, 0, right, top),
+                 pygame.Rect(0, height - bottom, left, bottom),
+                 pygame.Rect(width - right, height - bottom, right, bottom),
+                 pygame.Rect(0, top, self.edges.left, middle_height),
+                 pygame.Rect(left, 0, middle_width, self.edges.top),
+                 pygame.Rect(width - self.edges.right, top, self.edges.right, middle_height),
+                 pygame.Rect(left, height - self.edges.bottom, middle_width, self.edges.bottom)]
+        return [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+    def fits(self, size):
+        """Whether the tile can be stretched to `size`, which must leave room for the corners."""
+        return size[0] >= self.insets[0] + self.insets[2] and size[1] >= self.insets[1] + self.insets[3]
+
+    def stretch(self, size):
+        """Return the mask at the given size."""
+        return nine_slice(self.tile, self.insets, size)
+
+
+MASKS = LRUCache(32 * 2 ** 20)
+"""The masks of all the shapes, indexed by their mask_key(). Its budget is in bytes."""
+HIT_MASKS = LRUCache(8 * 2 ** 20, lambda mask: mask.get_size()[0] * mask.get_size()[1] // 8)
+"""The pygame.mask.Mask used by is_inside, indexed by mask_key(). Its budget is in bytes."""
+NINE_SLICES = LRUCache(8 * 2 ** 20, lambda nine_slice: surface_bytes(nine_slice.tile))
+"""The NineSlices of the shapes, indexed by the parameters of their corners. Its budget is in bytes."""
+OUTLINES = LRUCache(200000, len)
+"""The outlines of the PolarCurves, normalized and scaled to each size. Its budget is in points."""
+
+
 class Padding(namedtuple("Padding", ("left", "top", "right", "bottom"))):
     def __new__(cls, *args):
         # default value of 0
@@ -81,6 +158,14 @@ class Rectangle:
     The base shape that represent a rectangle.
     """
 
+    NINE_SLICE = True
+    """
+    Whether the masks of this exact class are made by stretching a tile, see nine_slice.
+
+    It isn't inherited: subclasses that change the mask (ie. by overriding get_mask or _get_mask) are drawn in full,
+    and the subclasses that keep the mask of their parent have to set it again.
+    """
+
     def __init__(self, size=DEFAULT, border=DEFAULT, padding=DEFAULT, min_size=DEFAULT, max_size=DEFAULT):
         """
         The most basic shape: a rectangle.
@@ -93,16 +178,18 @@ class Rectangle:
         """
 
         self.widget = None  # type: Widget
+        self._margins = None  # type: Margins
+        self._content_rect = None  # type: pygame.Rect
 
         self.border = border if border is not None else 0
 
-        self.bg_offset = (0, 0)
+        self._bg_offset = (0, 0)
         self.min_size = min_size if min_size else (5, 5)
         self.max_size = max_size if max_size else (None, None)
 
         if padding is DEFAULT:
             padding = 2
-        self.padding = padding if isinstance(padding, Padding) else Padding(padding)
+        self.padding = padding
 
         if size is DEFAULT:
             self.auto_size = True
@@ -116,6 +203,48 @@ class Rectangle:
         """A float giving a precise height for accurate resizing. Don't set it."""
         self.width, self.height = size
 
+    def invalidate_geometry(self):
+        """Forget the cached margins and content rectangle, and tell the widget it needs to be placed again."""
+
+        self._margins = None
+        self._content_rect = None
+        if self.widget:
+            self.widget.invalidate_layout()
+
+    # Border, padding, offset
+
+    @property
+    def border(self):
+        return self._border
+
+    @border.setter
+    def border(self, value):
+        self._border = value
+        self.invalidate_geometry()
+        if self.widget:
+            self.widget.invalidate()
+
+    @property
+    def padding(self):
+        return self._padding
+
+    @padding.setter
+    def padding(self, value):
+        self._padding = value if isinstance(value, Padding) else Padding(value)
+        self.invalidate_geometry()
+
+    @property
+    def bg_offset(self):
+        """Offset of the background relative to the topleft of the widget. Used by buttons when they are pressed."""
+        return self._bg_offset
+
+    @bg_offset.setter
+    def bg_offset(self, value):
+        # It is set every frame by buttons, so we don't want to replace them every time
+        if value != self._bg_offset:
+            self._bg_offset = value
+            self.invalidate_geometry()
+
     # Size, width, height
 
     @property
@@ -127,9 +256,11 @@ class Rectangle:
         self.last_width = self.width
         self.exact_width = value
 
-        if self.widget and self.last_width != self.width:
-            # so we re-draw the img on next render and reposition children
-            self.widget.invalidate()
+        if self.last_width != self.width:
+            self.invalidate_geometry()
+            if self.widget:
+                # so we re-draw the img on next render and reposition children
+                self.widget.invalidate()
 
     @property
     def height(self):
@@ -140,9 +271,11 @@ class Rectangle:
         self.last_height = self.height
         self.exact_height = value
 
-        if self.widget and self.last_height != self.height:
-            # so we re-draw the img on next render and reposition children
-            self.widget.invalidate()
+        if self.last_height != self.height:
+            self.invalidate_geometry()
+            if self.widget:
+                # so we re-draw the img on next render and reposition children
+                self.widget.invalidate()
 
     @property
     def size(self):
@@ -165,12 +298,26 @@ class Rectangle:
 
         self.widget.pos = getattr(new_rect, self.widget.anchor_to_rect_attr(anchor))
 
+    def mask_key(self):
+        """
+        Return the parameters that determine the mask of the shape. Shapes with the same key share their masks.
+
+        Override it in shapes that have other parameters changing their mask.
+        """
+        return type(self), self.width, self.height
+
     def get_mask(self):
         """
         Creates a white surface of the shape size
         with different levels of transparency for gradients and
         a transparency of 0 when a pixel is outside of the shape.
+
+        The mask is shared with the identical shapes, so don't modify it, copy it first.
         """
+        return MASKS.get_or_create(("mask",) + self.mask_key(), self._get_mask)
+
+    def _get_mask(self):
+        """Draw the mask. Override this instead of `get_mask`, which caches the result."""
 
         mask = pygame.Surface(self.size, pygame.SRCALPHA)
         mask.fill(INSIDE)
@@ -179,15 +326,89 @@ class Rectangle:
     def get_border_mask(self):
         """
         Get a mask with only the border of the widget with alpha values at 255 and the rest at 0.
+
+        The mask is shared with the identical shapes, so don't modify it, copy it first.
         """
+        return MASKS.get_or_create(("border", self.border) + self.mask_key(), self._get_border_mask)
 
-        mask = self.get_mask()
+    def get_hit_mask(self):
+        """
+        Return a pygame.mask.Mask of the pixels inside the shape, to test quickly if a point is inside.
+
+        The mask is shared with the identical shapes, so don't modify it.
+        """
+        return HIT_MASKS.get_or_create(self.mask_key(), self._get_hit_mask)
+
+    def _get_hit_mask(self):
+        # pixels on antialiased edges are inside if they are more than half opaque
+        return pygame.mask.from_surface(self.get_mask(), 127)
+
+    def _get_border_mask(self):
+        """Draw the border mask. Override this instead of `get_border_mask`, which caches the result."""
+
+        # only the shapes that opt in with NINE_SLICE have a tile, others are cut out of their own mask
+        tile = self.nine_slice(border=True)
+        if tile and tile.fits(self.size):
+            return tile.stretch(self.size)
+
+        mask = self.get_mask().copy()
         mask.fill(OUTSIDE, (self.border, self.border, self.width - 2 * self.border, self.height - 2 * self.border))
         return mask
 
+    def mask_areas(self, border=False):
+        """
+        Return the rectangles outside of which the mask is fully inside the shape (or the border mask fully
+        outside the border). Applying the mask only in those rectangles is the same as applying it everywhere.
+        """
+
+        tile = self.nine_slice(border)
+        if tile is None or not tile.fits(self.size):
+            return [pygame.Rect((0, 0), self.size)]
+
+        # the middle of the mask must leave the background unchanged, and the middle of the border mask hide the border
+        middle = tile.tile.get_at(tile.insets[:2])
+        if middle.a != 0 if border else middle != INSIDE:
+            return [pygame.Rect((0, 0), self.size)]
+
+        return tile.edges_rects(self.size)
+
+    def nine_slice(self, border=False):
+        """
+        Return the mask, or the border mask, as a NineSlice, or None if it can't be made by stretching a tile.
+
+        The tiles are cached in NINE_SLICES and depend only on the corners, so resizing a shape
+        only needs to stretch them instead of drawing the whole mask again.
+        """
+
+        if not self.has_nine_slice():
+            return None
+
+        # the middle of the tile is stretched to the middle of the mask, so it is outside only for border masks
+        b = self.border if border else 0
+        return NINE_SLICES.get_or_create(("rect", b, border), lambda: NineSlice.from_tile(
+            self._draw_rect_tile(b, border), (b, b, b, b)))
+
+    def has_nine_slice(self):
+        """Whether the class of the shape declares NINE_SLICE itself, so its masks can be stretched from tiles."""
+        return type(self).__dict__.get("NINE_SLICE", False)
+
+    @staticmethod
+    def _draw_rect_tile(border, border_mask):
+        tile = pygame.Surface((2 * border + 1, 2 * border + 1), pygame.SRCALPHA)
+        tile.fill(INSIDE)
+        if border_mask:
+            tile.fill(OUTSIDE, (border, border, 1, 1))
+        return tile
+
     @property
     def margins(self):
         """Return the margin between the border of the widget and the content rectangle."""
+        if self._margins is None:
+            self._margins = self._get_margins()
+        return self._margins
+
+    def _get_margins(self):
+        """Compute the margins. Override this instead of `margins`, which caches the result."""
         return Margins(self.border + self.padding.extra_height + max(0, self.bg_offset[0]),
                        self.border + max(0, self.bg_offset[1]),
                        self.border + self.padding.extra_width - min(0, self.bg_offset[0]),
@@ -200,9 +421,13 @@ class Rectangle:
         The rectangle is positioned relatively to the topleft of its widget.
         """
 
-        return pygame.Rect((self.margins.left, self.margins.top),
-                           (self.width - self.margins.left - self.margins.right,
-                            self.height - self.margins.top - self.margins.bottom))
+        if self._content_rect is None:
+            margins = self.margins
+            self._content_rect = pygame.Rect((margins.left, margins.top),
+                                             (self.width - margins.left - margins.right,
+                                              self.height - margins.top - margins.bottom))
+        # Rects are mutable, so we don't give away the cached one
+        return self._content_rect.copy()
 
     def widget_size_from_content_size(self, size):
         """Set the shape size the that the content_rect size is `size`."""
@@ -217,18 +442,45 @@ class Rectangle:
         The coordinate of the point are relative of the topleft of the shape (topleft = (0, 0))
         """
 
-        return bool(0 < relative_point[0] < self.width and 0 < relative_point[1] < self.height)
-
+        inside = bool(0 < relative_point[0] < self.width and 0 < relative_point[1] < self.height)
+        if not inside or type(self) is Rectangle:
+            return inside
+        # other shapes may draw any mask, the bounding box test also keeps the point inside the hit mask
+        return bool(self.get_hit_mask().get_at((int(relative_point[0]), int(relative_point[1]))))
 
 class RoundedRect(Rectangle):
+    NINE_SLICE = True
+
     def __init__(self, size=DEFAULT, rounding=20, percent=True, border=DEFAULT, padding=DEFAULT, min_size=DEFAULT,
                  max_size=DEFAULT):
         super().__init__(size, border, padding, min_size, max_size)
 
-        self.percent = percent
+        self._percent = percent
+        self._rounding = rounding
+
+    @property
+    def percent(self):
         """If true the rounding is evalutate in percentage of the size, otherwise in pixels."""
-        self.rounding = rounding
+        return self._percent
+
+    @percent.setter
+    def percent(self, value):
+        self._percent = value
+        self.invalidate_geometry()
+        if self.widget:
+            self.widget.invalidate()
+
+    @property
+    def rounding(self):
         """The amount rounded on each corner, it can be percents or pixels depending on :percent"""
+        return self._rounding
+
+    @rounding.setter
+    def rounding(self, value):
+        self._rounding = value
+        self.invalidate_geometry()
+        if self.widget:
+            self.widget.invalidate()
 
     @property
     def exact_rounding(self):
@@ -237,30 +489,80 @@ class RoundedRect(Rectangle):
             return int(min(self.size) * self.rounding / 100 / 2)
         return self.rounding
 
-    def get_mask(self):
-        mask = pygame.Surface(self.size, pygame.SRCALPHA)
-        roundrect(mask, mask.get_rect(), INSIDE, self.rounding, self.percent)
+    def mask_key(self):
+        return super().mask_key() + (self.rounding, self.percent)
+
+    def corner_diameter(self, size):
+        """Return the diameter in pixels of the circles that make the corners of a shape of the given size."""
+
+        rounding = int(min(size) * self.rounding / 100) if self.percent else self.rounding
+        return max(0, min(rounding, *size))
+
+    def _get_mask(self):
+        tile = self.nine_slice()
+        if tile is None:
+            return self._draw_mask(self.size, self.corner_diameter(self.size))
+        return tile.stretch(self.size)
+
+    def _get_border_mask(self):
+        tile = self.nine_slice(border=True)
+        if tile and tile.fits(self.size):
+            return tile.stretch(self.size)
+
+        inner_size = (max(0, self.width - 2 * self.border), max(0, self.height - 2 * self.border))
+        return self._draw_border_mask(self.size, self.corner_diameter(self.size), self.corner_diameter(inner_size))
+
+    def nine_slice(self, border=False):
+        if not self.has_nine_slice():
+            return None
+
+        outer = self.corner_diameter(self.size)
+
+        if not border:
+            return NINE_SLICES.get_or_create(("rounded", outer), lambda: NineSlice.from_tile(
+                self._draw_mask((outer + 1, outer + 1), outer),
+                (outer // 2, outer // 2, outer - outer // 2, outer - outer // 2)))
+
+        b = self.border
+        inner_size = (self.width - 2 * b, self.height - 2 * b)
+        if min(inner_size) <= 0:
+            return None
+
+        inner = self.corner_diameter(inner_size)
+        # the tile must contain the corners of both the outside and the inside of the border
+        left = max(outer // 2, b + inner // 2)
+        right = max(outer - outer // 2, b + inner - inner // 2)
+        size = (left + 1 + right, left + 1 + right)
+        return NINE_SLICES.get_or_create(("rounded", outer, inner, b), lambda: NineSlice.from_tile(
+            self._draw_border_mask(size, outer, inner), (left, left, right, right)))
+
+    @staticmethod
+    def _draw_mask(size, diameter):
+        mask = pygame.Surface(size, pygame.SRCALPHA)
+        roundrect(mask, mask.get_rect(), INSIDE, diameter)
         return mask
 
-    def get_border_mask(self):
-        mask = self.get_mask()
-        temp = pygame.Surface(mask.get_size(), pygame.SRCALPHA)
+    def _draw_border_mask(self, size, outer, inner):
+        mask = self._draw_mask(size, outer)
+        inside = pygame.Rect((0, 0), size).inflate(-2 * self.border, -2 * self.border)
+        if inside.width <= 0 or inside.height <= 0:
+            return mask  # the border fills the whole shape
+
+        temp = pygame.Surface(size, pygame.SRCALPHA)
         temp.fill((0, 0, 0, 1))
-        roundrect(temp, temp.get_rect().inflate(-2 * self.border, -2 * self.border), INSIDE, self.rounding,
-                  self.percent)
+        roundrect(temp, inside, INSIDE, inner)
         mask.blit(temp, (0, 0), None, pygame.BLEND_RGBA_SUB)
         return mask
 
-    @property
-    def margins(self):
+    def _get_margins(self):
         delta = (1 - HALFSQRT2) * self.exact_rounding
 
-        m = super().margins
+        m = super()._get_margins()
         return Margins(m.left + delta, m.top + delta, m.right + delta, m.bottom + delta)
 
     def widget_size_from_content_size(self, size):
         if self.percent:
-            m = super().margins
+            m = super()._get_margins()
             width = size[0] + m.left + m.right
             height = size[1] + m.top + m.bottom
 
@@ -277,13 +579,15 @@ class RoundedRect(Rectangle):
 
         else:
             delta = (1 - HALFSQRT2) * self.rounding
-            m = super().margins
+            m = super()._get_margins()
 
             return (size[0] + 2 * delta + m.left + m.right,
                     size[1] + 2 * delta + m.top + m.bottom)
 
 
 class Circle(RoundedRect):
+    NINE_SLICE = True
+
     def __init__(self, diameter=None, border=DEFAULT, padding=DEFAULT, min_size=DEFAULT, max_size=DEFAULT):
         if diameter is None:
             # noinspection PyTypeChecker
@@ -307,6 +611,24 @@ class Circle(RoundedRect):
 
 
 class PolarCurve(Rectangle):
+    """
+    A shape whose outline is the curve (x(t), y(t)) for t from 0 to 2pi, stretched to the size of the shape.
+
+    The functions can use numpy (ie. np.sin instead of math.sin) so they are evaluated on all the t at once.
+    """
+
+    INITIAL_SAMPLES = 65
+    """Number of points first sampled uniformly on the curve before splitting where it bends."""
+    TOLERANCE = 0.0001
+    """
+    Maximum distance between the sampled outline and the curve, relative to the size of the shape on each axis.
+    The outline is sampled once for all sizes, so this is a tenth of a pixel at a size of 1000.
+    """
+    MAX_SPLITS = 8
+    """Maximum number of times a segment of the initial samples can be split in two."""
+    DEFAULT_SAMPLES = 1000
+    """Number of points sampled uniformly when numpy isn't available."""
+
     def __init__(self, size, x_of_t, y_of_t, border=DEFAULT, padding=DEFAULT, min_size=DEFAULT, max_size=DEFAULT):
 
         self.x = x_of_t
@@ -314,41 +636,119 @@ class PolarCurve(Rectangle):
 
         super().__init__(size, border, padding, min_size, max_size)
 
-    def get_mask(self):
+    def mask_key(self):
+        return super().mask_key() + (self.x, self.y)
+
+    def _get_mask(self):
         mask = pygame.Surface(self.size, pygame.SRCALPHA)
 
-        pts = self.get_curve_points(1000)
+        pts = self.get_curve_points()
         polygon(mask, pts, (255, 255, 255, 255))
 
         return mask
 
-    def get_curve_points(self, nb_iterations):
-        pts = []
-        for t in range(nb_iterations):
-            t = t / (nb_iterations - 1) * 2 * pi
+    def get_curve_points(self, nb_iterations=None):
+        """
+        Return the points of the outline of the curve, scaled to the size of the shape.
+
+        The points are shared with the identical curves, so don't modify the list.
+        :param int nb_iterations: The number of points to sample uniformly. If None, the curve is sampled
+            with more points where it bends (only with numpy, otherwise it uses DEFAULT_SAMPLES uniform points).
+        """
 
-            x = self.x(t)  # (16 * sin(t) ** 3) / 32
-            y = self.y(t)  # (-13 * cos(t) + 5 * cos(2 * t) + 2 * cos(3 * t) + cos(4 * t)) / 32
+        key = ("points", self.x, self.y, nb_iterations, self.width, self.height)
+        return OUTLINES.get_or_create(key, self._get_curve_points, nb_iterations)
 
-            pts.append((x, y))
+    def _get_curve_points(self, nb_iterations):
+        # the outline is normalized once, and only scaled for each size
+        unit = OUTLINES.get_or_create(("unit", self.x, self.y, nb_iterations), self._get_unit_outline, nb_iterations)
+        width, height = self.size
 
-        # post treatment
+        if NUMPY:
+            pts = (np.asarray(unit) * (width, height)).astype(int)
+            # consecutive points in the same pixel are useless
+            keep = np.ones(len(pts), bool)
+            keep[1:] = np.any(pts[1:] != pts[:-1], axis=1)
+            return [tuple(p) for p in pts[keep].tolist()]
+
+        pts = []
+        for x, y in unit:
+            p = (int(x * width), int(y * height))
+            if not pts or p != pts[-1]:
+                pts.append(p)
+        return pts
 
-        dist = 1
-        last = pts[0]
-        for i, (x, y) in enumerate(pts[1:]):
-            if (last[0] - x) ** 2 + (last[1] - y) ** 2 < 1:  # dist ** 2:
-                pts.remove((x, y))
+    def _get_unit_outline(self, nb_iterations):
+        """Return the outline of the curve, normalized so it fits exactly in the square (0, 0, 1, 1)."""
+
+        if nb_iterations is None:
+            if NUMPY:
+                xs, ys = self._sample_adaptively()
             else:
-                last = x, y
+                xs, ys = self._evaluate(self._uniform_t(self.DEFAULT_SAMPLES))
+        else:
+            xs, ys = self._evaluate(self._uniform_t(nb_iterations))
 
-        minix = min(pts, key=lambda p: p[0])[0]
-        miniy = min(pts, key=lambda p: p[1])[1]
+        min_x, max_x = min(xs), max(xs)
+        min_y, max_y = min(ys), max(ys)
+        if NUMPY:
+            return np.column_stack(((xs - min_x) / (max_x - min_x), (ys - min_y) / (max_y - min_y))).tolist()
+        return [((x - min_x) / (max_x - min_x), (y - min_y) / (max_y - min_y)) for x, y in zip(xs, ys)]
 
-        maxix = max(pts, key=lambda p: p[0])[0]
-        maxiy = max(pts, key=lambda p: p[1])[1]
+    @staticmethod
+    def _uniform_t(nb_iterations):
+        if NUMPY:
+            return np.linspace(0, 2 * pi, nb_iterations)
+        return [t / (nb_iterations - 1) * 2 * pi for t in range(nb_iterations)]
 
-        for i, (x, y) in enumerate(pts):
-            pts[i] = (int((x - minix) / (maxix - minix) * self.size[0]),
-                      int((y - miniy) / (maxiy - miniy) * self.size[1]))
-        return pts
+    def _evaluate(self, ts):
+        """
+        Return the x and y coordinates of the curve for each t of ts.
+
+        With numpy, the functions are called once with an array of t if they support it (ie. they use np.sin)
+        and once for each t otherwise (ie. they use math.sin).
+        """
+
+        if not NUMPY:
+            return [self.x(t) for t in ts], [self.y(t) for t in ts]
+
+        try:
+            xs = np.broadcast_to(np.asarray(self.x(ts), float), ts.shape)
+            ys = np.broadcast_to(np.asarray(self.y(ts), float), ts.shape)
+        except (TypeError, ValueError):
+            values = ts.tolist()
+            xs = np.array([self.x(t) for t in values], float)
+            ys = np.array([self.y(t) for t in values], float)
+        return xs, ys
+
+    def _sample_adaptively(self):
+        """
+        Sample the curve with points closer together where it bends.
+
+        Segments whose middle is further from the curve than TOLERANCE, once the curve is normalized to the
+        square (0, 0, 1, 1), are split in two until they are all close enough or MAX_SPLITS is reached.
+        """
+
+        ts = self._uniform_t(self.INITIAL_SAMPLES)
+        xs, ys = self._evaluate(ts)
+        # the error is measured on the normalized outline, as it is stretched on each axis to the size of the shape
+        scale_x = 1 / (np.ptp(xs) or 1)
+        scale_y = 1 / (np.ptp(ys) or 1)
+
+        for _ in range(self.MAX_SPLITS):
+            mid_ts = (ts[:-1] + ts[1:]) / 2
+            mid_xs, mid_ys = self._evaluate(mid_ts)
+
+            # distance between the middle of the curve and the middle of the segment
+            error = np.hypot((mid_xs - (xs[:-1] + xs[1:]) / 2) * scale_x, (mid_ys - (ys[:-1] + ys[1:]) / 2) * scale_y)
+            split = error > self.TOLERANCE
+            if not split.any():
+                break
+
+            # the middles go just after the start of their segment
+            where = np.nonzero(split)[0] + 1
+            ts = np.insert(ts, where, mid_ts[split])
+            xs = np.insert(xs, where, mid_xs[split])
+            ys = np.insert(ys, where, mid_ys[split])
+
+        return xs, ys
@@ -0,0 +1,165 @@
+"""
+This module provides spatial indexes to find quickly which widgets or rectangles are at some place.
+
+SpatialIndex is used by `Screen.update` so mouse motions don't need to walk through every widget,
+and RectGrid by `WidgetList.render` to find which widgets are hidden behind others.
+"""
+
+from pygame.rect import Rect
+
+
+def cells_of(rect, cell_size):
+    """Yield the (column, row) of the cells of a grid that `rect` covers."""
+
+    for column in range(rect.left // cell_size, (rect.right - 1) // cell_size + 1):
+        for row in range(rect.top // cell_size, (rect.bottom - 1) // cell_size + 1):
+            yield column, row
+
+
+class SpatialIndex:
+    """
+    A uniform grid over the absolute rectangles of a tree of widgets.
+
+    The index keeps itself in sync: widgets tell it when they move or are resized,
+    and the WidgetLists when widgets are added or removed.
+    """
+
+    def __init__(self, widgets, cell_size=64):
+        """
+        A uniform grid over the absolute rectangles of a tree of widgets.
+
+        :param WidgetList widgets: The widgets to index, with their children.
+        :param int cell_size: The size in pixels of the (square) cells of the grid.
+        """
+
+        self.widgets = widgets
+        self.cell_size = cell_size
+
+        self.hovered = set()
+        """The widgets that have the mouse over them."""
+
+        self._cells = {}  # (column, row) -> list of widgets
+        self._rects = {}  # widget -> absolute rect
+        self._order = {}  # widget -> order in which widgets receive events
+        self._lists = []  # the WidgetLists that notify us of changes
+        self._stale = set()  # widgets that moved since their last indexing
+        self._needs_rebuild = True
+
+    def __len__(self):
+        self._refresh()
+        return len(self._order)
+
+    def invalidate(self):
+        """Rebuild the whole index on the next query. Used when widgets are added or removed."""
+        self._needs_rebuild = True
+
+    def moved(self, widget):
+        """Re-index the widget on the next query. Used when a widget moves or is resized."""
+        self._stale.add(widget)
+
+    def at(self, pos):
+        """Return the widgets whose rectangle contains `pos`, in no particular order."""
+
+        self._refresh()
+        cell = self._cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), ())
+        return [widget for widget in cell if self._rects[widget].collidepoint(pos)]
+
+    def mouse_motion(self, event):
+        """
+        Send a MOUSEMOTION event to the widgets it concerns, so they can react when the mouse enters,
+        moves over or exits them.
+
+        Only the widgets under the mouse and those that were under it before are updated,
+        in the same order as WidgetList.update would.
+        """
+
+        under = self.at(event.pos)  # refreshes the index first, which can change the hovered widgets
+        candidates = self.hovered.union(under)
+
+        for widget in sorted(candidates, key=self._order.__getitem__):
+            inside = widget.shape.is_inside(event.pos - widget.absolute_topleft)
+            widget.update_mouse_over(event, inside)
+
+        self.hovered = {widget for widget in candidates if widget.mouse_over}
+
+    # Indexing
+
+    def _refresh(self):
+        """Bring the index in sync with the widgets."""
+
+        if self._needs_rebuild:
+            self._rebuild()
+
+        for widget in self._stale:
+            if widget in self._order:
+                self._remove(widget)
+                self._insert(widget)
+        self._stale.clear()
+
+    def _rebuild(self):
+        for widget in self._order:
+            widget._spatial_index = None
+        for widget_list in self._lists:
+            widget_list.spatial_index = None
+
+        self._cells.clear()
+        self._rects.clear()
+        self._order.clear()
+        self._lists.clear()
+        self._stale.clear()
+
+        self._add_list(self.widgets)
+        # widgets can come back with the mouse still over them, they need to get their exit event
+        self.hovered = {widget for widget in self._order if widget.mouse_over}
+        self._needs_rebuild = False
+
+    def _add_list(self, widget_list):
+        widget_list.spatial_index = self
+        self._lists.append(widget_list)
+
+        for item in widget_list:
+            if isinstance(item, list):
+                # WidgetLists can be nested
+                self._add_list(item)
+            else:
+                # children receive events before their parent
+                self._add_list(item.children)
+                item._spatial_index = self
+                self._order[item] = len(self._order)
+                self._insert(item)
+
+    def _insert(self, widget):
+        rect = Rect(widget.absolute_topleft, widget.size)
+        self._rects[widget] = rect
+        for cell in cells_of(rect, self.cell_size):
+            self._cells.setdefault(cell, []).append(widget)
+
+    def _remove(self, widget):
+        for cell in cells_of(self._rects.pop(widget), self.cell_size):
+            self._cells[cell].remove(widget)
+
+
+class RectGrid:
+    """A uniform grid of rectangles, to find quickly the ones that collide with a given rectangle."""
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self._cells = {}  # (column, row) -> list of rects
+
+    def __bool__(self):
+        return bool(self._cells)
+
+    def insert(self, rect):
+        for cell in cells_of(rect, self.cell_size):
+            self._cells.setdefault(cell, []).append(rect)
+
+    def colliding(self, rect):
+        """Return the rects of the grid that collide with `rect`."""
+
+        found = []
+        for cell in cells_of(rect, self.cell_size):
+            for other in self._cells.get(cell, ()):
+                # a rect that spans several cells would be found multiple times
+                if other.colliderect(rect) and other not in found:
+                    found.append(other)
+        return found
@@ -0,0 +1,173 @@
+"""
+This module provides AnimatedImage, a widget that shows an animation from a sprite sheet or a list of frames.
+
+The frames are held by a SpriteAnimation, which can be shared by many widgets:
+
+    spinner = SpriteAnimation.from_sheet(IMAGES.load("spinner.png"), (32, 32), fps=12)
+    rows = [AnimatedImage(spinner, (10, 40 * i)) for i in range(200)]
+
+Changing frame doesn't repaint anything: the frames are scaled once for each size they are shown at,
+and the widget only blits the current one over its background.
+"""
+
+from time import perf_counter
+import logging
+
+import pygame
+
+from .cache import LRUCache, IMAGES, surface_bytes
+from .colors import image_rect
+from .constants import DEFAULT, FIT, TRANSPARENT
+from .core import Widget
+from .draw import make_transparent
+from .shadow import NoShadow
+
+LOGGER = logging.getLogger(__name__)
+
+
+def slice_sheet(sheet, frame_size, count=None):
+    """
+    Return the frames of a sprite sheet, read from left to right and top to bottom.
+
+    :param pygame.Surface sheet: The image with all the frames, on a grid.
+    :param frame_size: The size of one frame.
+    :param int count: The number of frames, if the last row is not full.
+    """
+
+    width, height = frame_size
+    columns = sheet.get_width() // width
+    rows = sheet.get_height() // height
+    if count is None:
+        count = columns * rows
+
+    # copies, so the frames don't keep the whole sheet locked when they are blited
+    return [sheet.subsurface((i % columns * width, i // columns * height, width, height)).copy()
+            for i in range(count)]
+
+
+class SpriteAnimation:
+    """
+    The frames of an animation, and the clock that chooses which one is shown.
+
+    An animation can be shared by many widgets: they all show the same frame at the same time,
+    and each frame is scaled only once for each size it is shown at.
+    """
+
+    CACHE_SIZE = 16 * 2 ** 20
+    """Budget in bytes of the scaled frames kept by each animation."""
+
+    def __init__(self, frames, fps=10, mode=FIT):
+        """
+        The frames of an animation.
+
+        :param frames: A list of surfaces.
+        :param fps: The number of frames shown per second.
+        :param mode: How the frames are scaled to the size of the widgets: CENTER, FIT, FILL or STRETCH.
+            See ImageBrush.
+        """
+
+        assert len(frames), "There should be at least one frame."
+
+        self.frames = tuple(frames)
+        self.fps = fps
+        self.mode = mode
+        self.start = perf_counter()
+        """The perf_counter at which the first frame was shown."""
+
+        # (frame index, size) -> (scaled frame, position on a surface of the size)
+        self._scaled = LRUCache(self.CACHE_SIZE, lambda item: surface_bytes(item[0]))
+
+    def __repr__(self):
+        return "<SpriteAnimation {} frames at {} fps>".format(len(self.frames), self.fps)
+
+    @classmethod
+    def from_sheet(cls, sheet, frame_size, count=None, fps=10, mode=FIT):
+        """Create an animation from a sprite sheet. See slice_sheet."""
+        return cls(slice_sheet(sheet, frame_size, count), fps, mode)
+
+    @classmethod
+    def from_files(cls, paths, fps=10, mode=FIT):
+        """Create an animation from one file per frame, loaded only once in the cache IMAGES."""
+        frames = [IMAGES.load(path) for path in paths]
+        return cls(frames, fps, mode)
+
+    @property
+    def frame_size(self):
+        return self.frames[0].get_size()
+
+    def index_at(self, time):
+        """Return the index of the frame shown at `time`, given by perf_counter."""
+        return int((time - self.start) * self.fps) % len(self.frames)
+
+    def frame(self, index, size):
+        """Return the frame `index` scaled for a surface of the given size, and its position on that surface."""
+
+        key = (index, size)
+        item = self._scaled.get(key)
+        if item is None:
+            frame = self.frames[index]
+            rect = image_rect(frame.get_rect(), pygame.Rect((0, 0), size), self.mode)
+            if rect.size != frame.get_size():
+                frame = pygame.transform.smoothscale(frame, rect.size)
+            item = frame, rect.topleft
+            self._scaled.put(key, item)
+        return item
+
+
+class AnimatedImage(Widget):
+    """
+    A widget that shows the frames of a SpriteAnimation over its background.
+
+    Changing frame doesn't invalidate any layer: the widget is only marked dirty so the current frame,
+    cached at the size of the content, is blited on the next render.
+    """
+
+    def __init__(self, animation, pos=DEFAULT, shape=DEFAULT, bg_color=DEFAULT, border_color=DEFAULT,
+                 shadow=DEFAULT, anchor=DEFAULT):
+        """
+        A widget that shows an animation.
+
+        :param SpriteAnimation animation: The frames to show. The same animation can be used by many widgets.
+        """
+
+        LOGGER.info("Starting to initialize AnimatedImage")
+
+        self.animation = animation
+        self.frame_index = 0
+        """The index of the frame shown."""
+
+        # Better defaults for images
+        if bg_color is DEFAULT:
+            bg_color = TRANSPARENT
+        if border_color is DEFAULT:
+            border_color = TRANSPARENT
+        if shadow is DEFAULT:
+            shadow = NoShadow()
+
+        super().__init__(pos, shape, DEFAULT, bg_color, border_color, shadow, anchor)
+        LOGGER.info("Finished initializing %s", self)
+
+    def __repr__(self):
+        return "<AnimatedImage at {}>".format(self.pos)
+
+    @property
+    def prefered_size(self):
+        return self.shape.widget_size_from_content_size(self.animation.frame_size)
+
+    def pre_render_update(self):
+        super().pre_render_update()
+
+        index = self.animation.index_at(perf_counter())
+        if index != self.frame_index:
+            self.frame_index = index
+            self._dirty = True
+
+    def _blit_layers(self, screen):
+        super()._blit_layers(screen)
+
+        content_rect = self.geometry.content_rect
+        frame, (x, y) = self.animation.frame(self.frame_index, content_rect.size)
+        if self.transparency is not None:
+            frame = frame.copy()
+            make_transparent(frame, self.transparency)
+        screen.blit(frame, (content_rect.x + x, content_rect.y + y))
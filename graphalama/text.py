@@ -30,7 +30,7 @@ class SimpleText(Widget):
             shadow = NoShadow()
 
         super().__init__(pos, shape, color, bg_color, border_color, shadow, anchor)
-        LOGGER.info(f"Finished initialized {self}")
+        LOGGER.info("Finished initialized %s", self)
 
     def __repr__(self):
         return "<SimpleText-{}>".format(self.text)
@@ -50,7 +50,7 @@ class SimpleText(Widget):
         else:
             # Only the content has changed, not the shadow/bg
             self.invalidate_content()
-        LOGGER.info(f"Text of {self} changed")
+        LOGGER.info("Text of %s changed", self)
 
     @property
     def prefered_size(self):
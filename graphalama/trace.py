@@ -0,0 +1,171 @@
+"""
+This module provides a tracer that measures where the time of each frame goes.
+
+`App.run` records a span for each phase of a frame (events, internal_logic, render, display, tick)
+and `WidgetList` one for the rendering of each widget. The last frames are kept in memory, to get
+statistics on the frame times or to export them in the Chrome trace format, which can be opened
+in chrome://tracing or https://ui.perfetto.dev.
+
+    from graphalama.trace import TRACER
+
+    TRACER.enable()
+    app.run()
+    print(TRACER.percentiles())
+    TRACER.export_chrome_trace("trace.json")
+
+The tracer is disabled by default and then costs only a check of `TRACER.enabled` at each place it could record.
+"""
+
+import json
+from collections import deque, namedtuple
+from time import perf_counter
+
+Span = namedtuple("Span", ("name", "category", "start", "duration", "args"))
+"""Something that took time during a frame. Times are in seconds, since an arbitrary point."""
+
+Frame = namedtuple("Frame", ("start", "duration", "spans"))
+"""A recorded frame and the spans of what happened during it."""
+
+
+class Tracer:
+    """Record the duration of the phases of the frames and of the rendering of widgets."""
+
+    def __init__(self, max_frames=300):
+        """
+        Record the duration of the phases of the frames and of the rendering of widgets.
+
+        :param int max_frames: Number of frames kept. Older frames are forgotten.
+        """
+
+        self.enabled = False
+        """Whether frames are recorded. Use enable() and disable() to change it."""
+        self.frames = deque(maxlen=max_frames)  # type: deque[Frame]
+        """The last frames recorded, the oldest first."""
+
+        self._frame_start = None
+        self._phase_start = None
+        self._spans = []
+
+    def enable(self, max_frames=None):
+        """Start recording frames, keeping only the last `max_frames` if it is given."""
+
+        if max_frames is not None and max_frames != self.frames.maxlen:
+            self.frames = deque(self.frames, maxlen=max_frames)
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording frames. The frames already recorded are kept."""
+
+        self.enabled = False
+        self._frame_start = None
+
+    def clear(self):
+        """Forget all the recorded frames."""
+        self.frames.clear()
+
+    # Recording
+
+    def begin_frame(self):
+        """Start a new frame, and its first phase."""
+
+        self._frame_start = self._phase_start = perf_counter()
+        self._spans = []
+
+    def end_phase(self, name):
+        """End the current phase of the frame, named `name`, and start the next one."""
+
+        if self._frame_start is None:
+            return  # the tracer was enabled during the frame
+
+        now = perf_counter()
+        self._spans.append(Span(name, "phase", self._phase_start, now - self._phase_start, None))
+        self._phase_start = now
+
+    def end_frame(self):
+        """End the frame and store it."""
+
+        if self._frame_start is None:
+            return
+
+        self.frames.append(Frame(self._frame_start, perf_counter() - self._frame_start, self._spans))
+        self._frame_start = None
+
+    def add_span(self, name, category, start, args=None):
+        """
+        Record a span that started at `start` (given by perf_counter) and ends now.
+
+        :param dict args: Extra information shown with the span in the trace viewers.
+        """
+
+        if self._frame_start is not None:
+            self._spans.append(Span(name, category, start, perf_counter() - start, args))
+
+    # Statistics
+
+    def frame_times(self, phase=None):
+        """
+        Return the durations in seconds of the recorded frames, or of one phase of each frame.
+
+        :param str phase: The name of a phase, ie. "render". If None, the whole frames are measured.
+        """
+
+        if phase is None:
+            return [frame.duration for frame in self.frames]
+
+        return [sum(span.duration for span in frame.spans if span.category == "phase" and span.name == phase)
+                for frame in self.frames]
+
+    def percentiles(self, percentiles=(50, 90, 99), phase=None):
+        """
+        Return the percentiles of the frame times, in seconds, as a dict {percentile: time}.
+
+        The percentiles are computed with the nearest-rank method. The dict is empty if no frame was recorded.
+        :param str phase: The name of a phase to measure it instead of the whole frames.
+        """
+
+        return nearest_rank(self.frame_times(phase), percentiles)
+
+    # Export
+
+    def chrome_trace(self):
+        """Return the recorded frames in the Chrome trace event format, as a dict ready to be dumped as JSON."""
+
+        events = []
+        for i, frame in enumerate(self.frames):
+            events.append(_trace_event("frame {}".format(i), "frame", frame.start, frame.duration, None))
+            for span in frame.spans:
+                events.append(_trace_event(*span))
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Write the recorded frames in the Chrome trace event format to the file at `path`."""
+
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def nearest_rank(times, percentiles):
+    """
+    Return the percentiles of a list of times as a dict {percentile: time}, or an empty dict if there are no times.
+
+    For each percentile p, this is the smallest time such that p% of the times are lower or equal.
+    """
+
+    times = sorted(times)
+    if not times:
+        return {}
+
+    return {p: times[max(0, min(len(times) - 1, -(-p * len(times) // 100) - 1))] for p in percentiles}
+
+
+def _trace_event(name, category, start, duration, args):
+    # "X" are complete events, with a start and a duration in microseconds
+    event = {"name": name, "cat": category, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 1, "tid": 1}
+    if args:
+        event["args"] = args
+    return event
+
+
+TRACER = Tracer()
+"""The tracer used by App and the widgets."""
@@ -1,3 +1,5 @@
 from .buttons import Button, ImageButton, CheckBox, CarouselSwitch
 from .text import SimpleText
 from .core import Widget, WidgetList
+from .overlay import PerfOverlay
+from .sprites import AnimatedImage, SpriteAnimation
@@ -0,0 +1,13 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+
+@pytest.fixture
+def display():
+    pygame.init()
+    yield pygame.display.set_mode((400, 300))
+    pygame.quit()
@@ -0,0 +1,144 @@
+import pygame
+import pytest
+
+from graphalama import colors
+from graphalama.app import Screen
+from graphalama.colors import ConicGradient, LinearGradient, RadialGradient
+from graphalama.core import Widget
+from graphalama.shadow import NoShadow
+from graphalama.shapes import Rectangle
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pygame"])
+def numpy(request, monkeypatch):
+    if request.param and not colors.NUMPY:
+        pytest.skip("numpy is not installed")
+    monkeypatch.setattr(colors, "NUMPY", request.param)
+    colors.GRADIENTS.clear()
+    return request.param
+
+
+@pytest.mark.filterwarnings("error")
+def test_radial_gradient_with_a_null_radius(display, numpy):
+    surf = pygame.Surface((10, 10), pygame.SRCALPHA)
+    RadialGradient(RED, BLUE, radius=0).paint(surf)
+
+    assert surf.get_at((0, 0)) == BLUE
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("gradient", [RadialGradient(RED, BLUE), LinearGradient(RED, BLUE, angle=30),
+                                      ConicGradient(RED, BLUE)], ids=["radial", "linear", "conic"])
+@pytest.mark.parametrize("size", [(0, 0), (0, 5), (1, 1)])
+def test_gradients_on_tiny_surfaces(display, numpy, gradient, size):
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    gradient.paint(surf)
+
+    if numpy:
+        # also the positions alone, that are not computed for empty surfaces when painting
+        assert gradient._positions(*size).shape == size
+
+
+class Clock:
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(colors, "perf_counter", clock)
+    yield clock
+    colors.PREVIEWS.clear()
+
+
+def image(color):
+    surf = pygame.Surface((20, 20), pygame.SRCALPHA)
+    surf.fill(color)
+    return surf
+
+
+def is_smooth(brush, size):
+    return brush._scaled.get((brush.image, size)) is not None
+
+
+def test_image_brush_previews_a_resize_until_it_settles(display, clock):
+    brush = colors.ImageBrush(image(RED))
+    repaints = []
+    repaint = lambda: repaints.append("repaint")  # the same callback every frame, like a widget would
+    for width in range(30, 40):
+        brush.scaled((width, width))
+        brush.watch_preview(repaint)
+        colors.repaint_settled_previews()
+        clock.time += 0.016
+
+    assert not is_smooth(brush, (39, 39))
+    assert repaints == []
+
+    clock.time += brush.SETTLE_TIME
+    colors.repaint_settled_previews()
+    assert repaints == ["repaint"]
+    brush.scaled((39, 39))
+    assert is_smooth(brush, (39, 39))
+    assert brush not in colors.PREVIEWS
+
+
+def test_image_brush_shared_by_widgets_of_different_sizes(display, clock):
+    brush = colors.ImageBrush(image(RED))
+    brush.scaled((30, 30))
+    brush.scaled((50, 40))
+
+    assert is_smooth(brush, (30, 30)) and is_smooth(brush, (50, 40))
+    assert brush not in colors.PREVIEWS
+
+
+def test_image_list_brush_switching_images(display, clock):
+    brush = colors.ImageListBrush(image(RED), image(BLUE), image((0, 255, 0)))
+    surf = pygame.Surface((40, 40), pygame.SRCALPHA)
+    for index in (0, 1, 2, 0, 1):
+        brush.index = index
+        brush.paint(surf)
+        assert is_smooth(brush, (40, 40))
+        clock.time += 0.016
+
+    assert brush not in colors.PREVIEWS
+
+
+def test_image_brush_calls_the_watchers_of_a_preview_once(display, clock):
+    brush = colors.ImageBrush(image(RED))
+    repaints = []
+    for width in range(30, 40):
+        brush.scaled((width, width))
+        clock.time += 0.016
+    brush.watch_preview(lambda: repaints.append("widget"))
+    brush.watch_preview(lambda: repaints.append("other widget"))
+
+    # The widgets of the preview were removed, so the size is never painted again
+    for _ in range(3):
+        clock.time += brush.SETTLE_TIME
+        colors.repaint_settled_previews()
+
+    assert sorted(repaints) == ["other widget", "widget"]
+    assert brush not in colors.PREVIEWS
+
+
+def test_image_brush_border_is_repainted_once_the_resize_settles(display, clock):
+    brush = colors.ImageBrush(image(RED), mode=colors.STRETCH)
+    widget = Widget((0, 0), Rectangle((30, 30), border=3), bg_color=BLUE, border_color=brush, shadow=NoShadow())
+    screen = Screen(None, [widget])
+    for width in range(30, 40):
+        widget.size = (width, width)
+        screen.render(display)
+        clock.time += 0.016
+    assert not is_smooth(brush, (39, 39))
+
+    clock.time += brush.SETTLE_TIME
+    assert screen.render(display)
+    assert is_smooth(brush, (39, 39))
+    assert screen.render(display) == []
@@ -0,0 +1,149 @@
+import random
+
+import pygame
+import pytest
+from pygame.constants import KEYDOWN, TEXTINPUT, MOUSEMOTION, K_a, K_b
+
+from graphalama.app import App, Screen
+from graphalama.core import Widget
+from graphalama.shadow import NoShadow
+from graphalama.shapes import Rectangle
+
+
+def key(k=K_a):
+    return pygame.event.Event(KEYDOWN, key=k, mod=0, unicode="a")
+
+
+def text(t="a"):
+    return pygame.event.Event(TEXTINPUT, text=t)
+
+
+def test_key_repeat_is_merged():
+    events = [key(), key(), key(), key(K_b)]
+    assert Screen(None).preprocess_events(events) == [events[0], events[3]]
+
+
+def test_key_repeat_with_text_input_is_kept():
+    events = [key(), text(), key(), text(), key(), text()]
+    assert Screen(None).preprocess_events(events) == events
+
+
+def test_key_repeat_before_text_input_is_kept():
+    # KEYDOWN and TEXTINPUT must stay in sync, even when they are not interleaved
+    events = [key(), key(), text(), text()]
+    assert Screen(None).preprocess_events(events) == events
+
+
+def test_mouse_motions_are_merged():
+    events = [pygame.event.Event(MOUSEMOTION, pos=(i, i), rel=(1, 2), buttons=(0, 0, 0)) for i in range(3)]
+    merged = Screen(None).preprocess_events(events)
+    assert len(merged) == 1
+    assert merged[0].pos == (2, 2) and merged[0].rel == (3, 6)
+
+
+class FilteringScreen(Screen):
+    EVENT_TYPES = (KEYDOWN,)
+
+
+def test_screens_keep_the_events_blocked_by_the_application(display):
+    pygame.event.set_allowed(None)
+    pygame.event.set_blocked(MOUSEMOTION)
+
+    app = App({"plain": Screen, "filtering": FilteringScreen}, "plain", display)
+    assert pygame.event.get_blocked(MOUSEMOTION)
+
+    app.set_screen("filtering")
+    assert pygame.event.get_blocked(TEXTINPUT)
+    assert not pygame.event.get_blocked(KEYDOWN)
+
+    app.set_screen("plain")
+    assert pygame.event.get_blocked(MOUSEMOTION)
+    assert not pygame.event.get_blocked(TEXTINPUT)
+
+
+def test_switching_screens_keeps_custom_events_blocked(display):
+    custom = pygame.event.custom_type()
+    pygame.event.set_allowed(None)
+    pygame.event.set_blocked(custom)
+    app = App({"plain": Screen, "filtering": FilteringScreen}, "plain", display)
+
+    app.set_screen("filtering")
+    app.set_screen("plain")
+    assert pygame.event.get_blocked(custom)
+    pygame.event.set_allowed(None)
+
+
+class LoggingWidget(Widget):
+    def __init__(self, name, log, pos, size):
+        self.name = name
+        self.log = log
+        super().__init__(pos, Rectangle(size), shadow=NoShadow())
+
+    def on_mouse_enter(self, event):
+        self.log.append(("enter", self.name))
+
+    def on_mouse_exit(self, event):
+        self.log.append(("exit", self.name))
+
+
+class World:
+    """A screen with widgets that log the mouse entering and exiting them."""
+
+    def __init__(self, display, spatial_index):
+        self.log = []
+        self.created = []
+        self.removed = []
+        self.screen = Screen(None, [])
+        self.screen.SPATIAL_INDEX = spatial_index
+        self.display = display
+
+    def new_widget(self, pos, size):
+        widget = LoggingWidget(len(self.created), self.log, pos, size)
+        self.created.append(widget)
+        return widget
+
+    def step(self, rng):
+        """Do one random change, drawn from `rng` so two worlds with equal rngs do the same."""
+
+        widgets = list(self.screen.widgets.walk())
+        action = rng.choice(["add", "add child", "move", "resize", "remove", "readd", "hide", "motion", "motion"])
+        pos = (rng.randrange(400), rng.randrange(300))
+        size = (rng.randrange(5, 120), rng.randrange(5, 120))
+
+        if action == "add" or not widgets and action != "motion":
+            self.screen.widgets.append(self.new_widget(pos, size))
+        elif action == "add child":
+            rng.choice(widgets).add_child(self.new_widget((pos[0] // 4, pos[1] // 4), size))
+        elif action == "move":
+            rng.choice(widgets).pos = pos
+        elif action == "resize":
+            # parents scale their children, which can shrink them down to nothing after a few resizes
+            rng.choice([widget for widget in widgets if not widget.children]).size = size
+        elif action == "remove":
+            widget = rng.choice(widgets)
+            owner = widget.parent.children if widget.parent else self.screen.widgets
+            owner.remove(widget)
+            self.removed.append(widget)
+        elif action == "readd" and self.removed:
+            widget = self.removed.pop(rng.randrange(len(self.removed)))
+            widget.parent = None
+            self.screen.widgets.append(widget)
+        elif action == "hide":
+            widget = rng.choice(widgets)
+            widget.visible = not widget.visible
+        else:
+            self.screen.update(pygame.event.Event(MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+
+    def state(self):
+        return self.log, [widget.mouse_over for widget in self.created]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_spatial_index_sends_the_same_mouse_events_as_the_tree_walk(display, seed):
+    indexed, walked = World(display, True), World(display, False)
+    indexed_rng, walked_rng = random.Random(seed), random.Random(seed)
+
+    for _ in range(200):
+        indexed.step(indexed_rng)
+        walked.step(walked_rng)
+        assert indexed.state() == walked.state()
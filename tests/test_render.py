@@ -0,0 +1,224 @@
+import pygame
+import pytest
+
+from graphalama.app import Screen
+from graphalama.colors import Color
+from graphalama.constants import WHITE
+from graphalama.core import Widget, WidgetList
+from graphalama.overlay import PerfOverlay
+from graphalama.shapes import Rectangle, RoundedRect
+from graphalama.shadow import NoShadow
+
+
+def make_widget(pos, size=(50, 40)):
+    return Widget(pos, Rectangle(size), bg_color=(255, 0, 0), shadow=NoShadow())
+
+
+def count_not_white(display):
+    return sum(display.get_at((x, y))[:3] != WHITE[:3]
+               for x in range(display.get_width()) for y in range(display.get_height()))
+
+
+def test_removing_a_widget_redraws_where_it_was(display):
+    first, second = make_widget((10, 10)), make_widget((100, 100))
+    screen = Screen(None, [first, second])
+    screen.render(display)
+    drawn = count_not_white(display)
+
+    screen.widgets.remove(first)
+    rects = screen.render(display)
+
+    assert rects
+    assert count_not_white(display) == drawn - 50 * 40
+
+
+def test_removing_a_child_redraws_where_it_was(display):
+    parent = make_widget((10, 10), (200, 200))
+    parent.bg_color = WHITE
+    child = parent.add_child(make_widget((20, 20)))
+    screen = Screen(None, [parent])
+    screen.render(display)
+    assert count_not_white(display) > 0
+
+    parent.children.pop()
+    screen.render(display)
+
+    assert child._drawn_rect is None
+    assert count_not_white(display) == count_not_white_border(parent)
+
+
+def count_not_white_border(widget):
+    # the default border of the widget is grey
+    border = widget.shape.border
+    width, height = widget.size
+    return width * height - (width - 2 * border) * (height - 2 * border)
+
+
+def test_replacing_the_widgets_redraws_everything(display):
+    screen = Screen(None, [make_widget((10, 10))])
+    screen.render(display)
+
+    screen.widgets = [make_widget((100, 100))]
+    rects = screen.render(display)
+
+    assert rects == [display.get_rect()]
+    assert count_not_white(display) == 50 * 40
+
+
+def test_draw_background_can_be_overridden_with_one_argument(display):
+    class MyScreen(Screen):
+        def draw_background(self, display):
+            display.fill((0, 0, 255))
+
+    screen = MyScreen(None, [make_widget((10, 10))])
+    screen.render(display)
+    screen.widgets[0].pos = (60, 60)
+    screen.render(display)
+
+    assert display.get_at((15, 15)) == pygame.Color(0, 0, 255)
+
+
+def test_transparency_caps_the_alpha_of_the_layers(display):
+    opaque = make_widget((0, 0))
+    faded = make_widget((0, 0))
+    faded.bg_color = (255, 0, 0, 100)
+    for widget in (opaque, faded):
+        widget.transparency = 150
+
+    alphas = []
+    for widget in (opaque, faded):
+        surf = pygame.Surface((50, 40), pygame.SRCALPHA)
+        widget._blit_layers(surf)
+        alphas.append(surf.get_at((25, 20)).a)
+
+    assert alphas == [150, 100]
+    assert opaque.background_image.get_at((25, 20)).a == 255
+
+
+def test_plain_border_is_drawn_like_a_painted_one(display):
+    class PaintedColor(Color):
+        pass
+
+    images = []
+    for border_color in (Color((200, 20, 20, 180)), PaintedColor((200, 20, 20, 180))):
+        widget = Widget((0, 0), RoundedRect((400, 300), border=3), bg_color=(30, 144, 255),
+                        border_color=border_color, shadow=NoShadow())
+        surf = pygame.Surface((400, 300), pygame.SRCALPHA)
+        widget.draw_background(surf)
+        images.append(pygame.image.tostring(surf, "RGBA"))
+
+    assert images[0] == images[1]
+
+
+def test_perf_overlay_shows_the_previous_frame(display):
+    widget = make_widget((10, 10))
+    screen = Screen(None, [widget])
+    overlay = PerfOverlay(screen, pos=(200, 200))
+    screen.widgets.append(overlay)
+    screen.render(display)
+    screen.render(display)  # nothing changed
+
+    overlay._last_refresh = None
+    screen.render(display)
+
+    assert Widget.RENDER_STATS.rendered >= 1  # the overlay was repainted...
+    assert "rendered 0 culled 0" in overlay._lines  # ...but it shows the idle frame before
+    assert "rasterized 0" in overlay._lines
+
+
+def test_cached_bytes_count_the_transparent_copies(display):
+    widget = make_widget((10, 10))
+    screen = Screen(None, [widget])
+    screen.render(display)
+    opaque = widget.cached_bytes
+
+    widget.transparency = 100
+    screen.render(display)
+
+    assert widget.cached_bytes == opaque + 50 * 40 * 4
+
+
+def test_deleting_a_slice_redraws_the_removed_widgets_and_their_children(display):
+    widgets = [make_widget((10 + 60 * i, 10)) for i in range(4)]
+    widgets[1].add_child(make_widget((0, 0), (10, 10)))
+    screen = Screen(None, widgets)
+    screen.render(display)
+    removed = [widgets[1], widgets[1].children[0], widgets[2]]
+    drawn = [w._drawn_rect for w in removed]
+
+    del screen.widgets[1:3]
+
+    assert screen.widgets.removed_rects == drawn
+    assert all(w._drawn_rect is None for w in removed)
+    assert widgets[0]._drawn_rect is not None
+
+
+def test_removing_doesnt_walk_the_remaining_widgets(display, monkeypatch):
+    screen = Screen(None, [make_widget((i, i)) for i in range(50)])
+    screen.render(display)
+    walked = []
+    walk = WidgetList.walk
+    monkeypatch.setattr(WidgetList, "walk", lambda self: walked.append(self) or walk(self))
+
+    while screen.widgets:
+        screen.widgets.pop()
+
+    assert all(walked_list is not screen.widgets for walked_list in walked)
+    assert len(screen.widgets.removed_rects) == 50
+
+
+def make_cover(pos, size, bg_color=(255, 0, 0), shape=Rectangle):
+    return Widget(pos, shape(size), bg_color=bg_color, shadow=NoShadow(), border_color=None)
+
+
+def test_a_widget_covered_by_an_opaque_one_is_culled(display, monkeypatch):
+    hidden = make_widget((10, 10))
+    hidden.bg_color = (0, 0, 255)
+    cover = make_cover((0, 0), (100, 100))
+    screen = Screen(None, [hidden, cover])
+    screen.render(display)
+    monkeypatch.setattr(hidden, "_blit_layers", lambda screen: pytest.fail("the hidden widget was drawn"))
+
+    cover.bg_color = (0, 255, 0)  # repaints the area of both widgets
+    screen.render(display)
+
+    assert Widget.RENDER_STATS.culled == 1
+    assert Widget.RENDER_STATS.rendered == 1
+    assert display.get_at((20, 20)) == pygame.Color(0, 255, 0)
+
+
+def test_the_uncovered_part_of_a_widget_is_drawn(display):
+    below = make_widget((10, 10))
+    below.bg_color = (0, 0, 255)
+    cover = make_cover((40, 0), (100, 100))
+    screen = Screen(None, [below, cover])
+
+    screen.render(display)
+    assert Widget.RENDER_STATS.rendered == 2
+    assert display.get_at((20, 20)) == pygame.Color(0, 0, 255)
+    assert display.get_at((45, 20)) == pygame.Color(255, 0, 0)
+
+    cover.pos = (50, 0)  # uncovers a strip of the widget below, on a dirty frame
+    screen.render(display)
+    assert Widget.RENDER_STATS.rendered == 2
+    assert display.get_at((45, 20)) == pygame.Color(0, 0, 255)
+    assert display.get_at((55, 20)) == pygame.Color(255, 0, 0)
+
+
+@pytest.mark.parametrize("kwargs", [dict(bg_color=(255, 0, 0, 128)), dict(shape=RoundedRect)])
+def test_what_shows_through_a_cover_is_drawn(display, kwargs):
+    cover = make_cover((0, 0), (100, 100), **kwargs)
+    below = Widget((0, 0), Rectangle((100, 100)), bg_color=(0, 0, 255), shadow=NoShadow(), border_color=None)
+    screen = Screen(None, [below, cover])
+    screen.render(display)
+    alone = Screen(None, [cover])
+    alone.render(display)
+    without_below = display.copy()
+
+    screen.invalidate()
+    screen.render(display)
+
+    assert Widget.RENDER_STATS.rendered == 2
+    corner = display.get_at((1, 1))
+    assert corner != without_below.get_at((1, 1))
+    assert corner.b > 0  # the blue widget below shows through
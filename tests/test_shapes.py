@@ -0,0 +1,164 @@
+import pygame
+import pytest
+
+from graphalama.core import Widget
+from graphalama.draw import polygon
+from graphalama.shadow import NoShadow
+from graphalama.shapes import INSIDE, Circle, PolarCurve, Rectangle, RoundedRect
+
+np = pytest.importorskip("numpy")
+
+
+def heart():
+    return (lambda t: 16 * np.sin(t) ** 3,
+            lambda t: -13 * np.cos(t) + 5 * np.cos(2 * t) + 2 * np.cos(3 * t) + np.cos(4 * t))
+
+
+def flower():
+    return (lambda t: (1 + 0.3 * np.cos(7 * t)) * np.cos(t),
+            lambda t: (1 + 0.3 * np.cos(7 * t)) * np.sin(t))
+
+
+def inside(shape, nb_iterations):
+    surf = pygame.Surface(shape.size, pygame.SRCALPHA)
+    polygon(surf, shape.get_curve_points(nb_iterations), (255, 255, 255, 255))
+    return pygame.surfarray.array_alpha(surf) > 127
+
+
+def grow(pixels):
+    """The pixels and their 8 neighbours."""
+    padded = np.pad(pixels, 1)
+    width, height = pixels.shape
+    return np.any([padded[dx:dx + width, dy:dy + height] for dx in range(3) for dy in range(3)], axis=0)
+
+
+def distances_to_outline(points, outline):
+    """The distance of each point to the closest segment of the closed polyline `outline`."""
+    start = outline[:, None, :]
+    direction = np.roll(outline, -1, axis=0)[:, None, :] - start
+    length = np.maximum((direction ** 2).sum(axis=2), 1e-12)
+    t = np.clip(((points[None, :, :] - start) * direction).sum(axis=2) / length, 0, 1)
+    closest = start + t[:, :, None] * direction
+    return np.sqrt(((points[None, :, :] - closest) ** 2).sum(axis=2)).min(axis=0)
+
+
+@pytest.mark.parametrize("curve", [heart, flower])
+def test_adaptive_outline_stays_close_to_the_curve(display, curve):
+    size = np.array((1280, 720))
+    shape = PolarCurve(tuple(size), *curve())
+    outline = np.array(shape._get_unit_outline(None)) * size
+    reference = np.array(shape._get_unit_outline(5000)) * size
+
+    assert len(outline) < 1000
+    assert distances_to_outline(reference, outline).max() < 0.25
+
+
+@pytest.mark.parametrize("curve", [heart, flower])
+@pytest.mark.parametrize("size", [(200, 200), (800, 300)])
+def test_adaptive_mask_matches_a_dense_reference(display, curve, size):
+    shape = PolarCurve(size, *curve())
+    reference = inside(shape, 20000)
+    adaptive = inside(shape, None)
+
+    # they only differ on the pixels of the edge
+    assert not (adaptive & ~grow(reference)).any()
+    assert not (reference & ~grow(adaptive)).any()
+
+
+def test_curve_is_sampled_once_for_all_sizes(display):
+    calls = []
+    x, y = heart()
+    shape = PolarCurve((100, 100), lambda t: calls.append(t) or x(t), y)
+    shape.get_mask()
+    sampled = len(calls)
+
+    for size in ((200, 150), (640, 480)):
+        shape.size = size
+        shape.get_mask()
+
+    assert sampled and len(calls) == sampled
+
+
+def test_border_mask_of_a_polar_curve_follows_the_curve(display):
+    shape = PolarCurve((100, 100), np.cos, np.sin, border=4)
+    border = pygame.surfarray.array_alpha(shape.get_border_mask())
+
+    # the mask of the curve, without the rectangle inside the border
+    expected = pygame.surfarray.array_alpha(shape.get_mask()).copy()
+    expected[4:96, 4:96] = 0
+
+    assert shape.nine_slice(border=True) is None
+    assert (border == expected).all()
+    assert (border > 0).sum() < 100 * 100 - 92 * 92
+
+
+class Triangle(Rectangle):
+    def _get_mask(self):
+        mask = pygame.Surface(self.size, pygame.SRCALPHA)
+        polygon(mask, [(0, self.height), (self.width // 2, 0), (self.width, self.height)], INSIDE)
+        return mask
+
+
+def test_background_of_a_custom_shape_follows_its_mask(display):
+    widget = Widget((0, 0), Triangle((100, 80)), bg_color=(255, 0, 0), shadow=NoShadow())
+    surf = pygame.Surface((100, 80), pygame.SRCALPHA)
+    widget.draw_background(surf)
+
+    assert widget.shape.nine_slice() is None
+    assert widget.shape.mask_areas() == [pygame.Rect(0, 0, 100, 80)]
+    assert surf.get_at((2, 2)).a == 0
+    assert surf.get_at((50, 70)) == (255, 0, 0, 255)
+
+
+def test_rounded_rect_and_circle_are_stretched_from_tiles(display):
+    assert RoundedRect((100, 80)).nine_slice() is not None
+    assert Circle(50).nine_slice() is not None
+
+
+class Diamond(Rectangle):
+    """A shape that overrides the public get_mask, without the cache."""
+
+    def get_mask(self):
+        mask = pygame.Surface(self.size, pygame.SRCALPHA)
+        w, h = self.size
+        polygon(mask, [(w // 2, 0), (w, h // 2), (w // 2, h), (0, h // 2)], INSIDE)
+        return mask
+
+
+def test_border_mask_of_a_shape_overriding_get_mask(display):
+    shape = Diamond((100, 100), border=4)
+    border = pygame.surfarray.array_alpha(shape.get_border_mask())
+
+    assert shape.nine_slice(border=True) is None
+    # the corners are outside the diamond, so outside its border too
+    assert border[1, 1] == 0 and border[98, 98] == 0
+    assert border[50, 1] > 0
+
+
+class Clickable(Widget):
+    ACCEPT_CLICKS = True
+
+
+def click(widget, pos):
+    widget.update(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+    return widget.clicked
+
+
+def test_clicks_in_the_corners_of_a_rounded_rect(display):
+    # the corners are circles of radius 20 centered at 20 pixels from the sides
+    widget = Clickable((0, 0), RoundedRect((100, 100), rounding=40), shadow=NoShadow())
+
+    assert not click(widget, (3, 3))
+    assert not click(widget, (96, 96))
+    assert click(widget, (8, 8))
+    assert click(widget, (91, 91))
+    assert click(widget, (1, 50))
+
+
+@pytest.mark.parametrize("shape", [Triangle((100, 80)), Diamond((100, 100))])
+def test_clicks_follow_the_mask_of_custom_shapes(display, shape):
+    widget = Clickable((0, 0), shape, shadow=NoShadow())
+
+    assert not click(widget, (5, 5))
+    assert not click(widget, (94, 5))
+    assert click(widget, (50, 60))